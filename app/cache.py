@@ -0,0 +1,96 @@
+"""
+Response cache for check_order_status (RESPONSE_CACHE_MB).
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+class ResponseCache:
+    """LRU of encoded response bodies keyed by order id, bounded in bytes.
+
+    ``invalidate`` drops one order (called from save()); ``clear`` drops
+    everything (reloads).  Writes by other workers arrive through
+    ``token()``.  A body built from state
+    read before an invalidation must not be stored after it, so callers
+    take a ``token()`` before reading and ``put`` refuses stale tokens.
+    """
+
+    ENTRY_OVERHEAD = 120  # OrderedDict node + key + bytes header, roughly
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._generation = 0
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "invalidations": 0, "evictions": 0, "clears": 0}
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is None:
+                self.stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats["hits"] += 1
+            return body
+
+    def token(self, stale: Optional[Iterable[str]] = ()) -> int:
+        """Current generation, after dropping the *stale* orders first
+        (changed by another worker; None means everything did).  Both
+        happen under one lock, so no put() holding an older token can land
+        in between."""
+        with self._lock:
+            if stale is None:
+                self._clear()
+            else:
+                for key in stale:
+                    self._invalidate(key)
+            return self._generation
+
+    def put(self, key: str, body: bytes, token: int) -> None:
+        size = len(body) + len(key) + self.ENTRY_OVERHEAD
+        with self._lock:
+            if token != self._generation or size > self.max_bytes:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old) + len(key) + self.ENTRY_OVERHEAD
+            self._entries[key] = body
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                k, v = self._entries.popitem(last=False)
+                self._bytes -= len(v) + len(k) + self.ENTRY_OVERHEAD
+                self.stats["evictions"] += 1
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._invalidate(key)
+
+    def _invalidate(self, key: str) -> None:
+        self._generation += 1
+        body = self._entries.pop(key, None)
+        if body is not None:
+            self._bytes -= len(body) + len(key) + self.ENTRY_OVERHEAD
+            self.stats["invalidations"] += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._generation += 1
+        self._entries.clear()
+        self._bytes = 0
+        self.stats["clears"] += 1
+
+    def report(self) -> Dict[str, Any]:
+        lookups = self.stats["hits"] + self.stats["misses"]
+        return {
+            **self.stats,
+            "hit_rate": round(self.stats["hits"] / lookups, 4) if lookups else None,
+            "entries": len(self._entries),
+            "memory_bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+        }
@@ -0,0 +1,144 @@
+"""
+Synthetic dataset generator
+—————————————
+Writes a dataset with the same shape as retell_mock_full_dataset.json
+(`orders` / `products` / `users` / `edge_cases`) but at arbitrary scale, so the
+storage modes in main.py can be benchmarked against millions of orders.
+
+The file is streamed to disk one record at a time, so generating a
+10-million-order dataset needs no more memory than generating ten.
+
+    python generate_dataset.py --orders 2000000 --out big_dataset.json
+    DATA_FILE=$PWD/big_dataset.json STORE_MODE=sqlite uvicorn main:app
+"""
+
+import argparse
+import json
+import pathlib
+import random
+import string
+import sys
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator
+
+BASE_DIR = pathlib.Path(__file__).parent
+TEMPLATE_FILE = BASE_DIR / "retell_mock_full_dataset.json"
+
+VENDORS = ["FreshMart", "QuickFood", "Bolt Grocery", "Volt Market"]
+ORDER_TYPES = ["grocery", "restaurant", "retail"]
+STATUSES = ["pending", "preparing", "dispatched", "delivered", "cancelled"]
+ISSUES = ["missing_item", "wrong_item", "spoiled", "late_delivery"]
+FIRST_NAMES = ["Alex", "Jordan", "Sam", "Dana", "Noa", "Yael", "Omar", "Lior", "Maya", "Eitan"]
+LANGUAGES = ["en", "en", "en", "he", "ar"]
+
+
+# ----------- Record factories --------------------------------------------- #
+
+def order_id(n: int) -> str:
+    # A1000 … A9999 matches the bundled file; larger datasets just grow digits.
+    return f"A{1000 + n}"
+
+
+def user_id(n: int) -> str:
+    return f"U{100 + n}"
+
+
+def product_id(n: int) -> str:
+    alphabet = string.ascii_uppercase + string.digits
+    out = []
+    for _ in range(6):
+        n, r = divmod(n, len(alphabet))
+        out.append(alphabet[r])
+    return "".join(reversed(out))
+
+
+def make_order(n: int, n_users: int, rng: random.Random, today: date) -> Dict[str, Any]:
+    status = rng.choice(STATUSES)
+    issues = rng.sample(ISSUES, rng.choice((0, 0, 1, 1, 2)))
+    delivered = status == "delivered"
+    return {
+        "order_id": order_id(n),
+        "user_id": user_id(rng.randrange(n_users)),
+        "status": status,
+        "vendor_name": rng.choice(VENDORS),
+        "order_type": rng.choice(ORDER_TYPES),
+        "delivery_eta": None if delivered or status == "cancelled" else f"{rng.randint(10, 60)} min",
+        "delivered_at": (today - timedelta(days=rng.randint(0, 14))).isoformat() if delivered else None,
+        "items": [
+            {"product_name": f"Item {i}", "qty": rng.randint(1, 3)}
+            for i in range(rng.randint(1, 4))
+        ],
+        "issues": issues,
+        "can_cancel": status in {"pending", "preparing"},
+        "eligible_for_refund": delivered and rng.random() < 0.5,
+    }
+
+
+def make_product(n: int, rng: random.Random) -> Dict[str, Any]:
+    qty = rng.randint(0, 50)
+    return {
+        "product_id": product_id(n),
+        "product_name": f"Product {n + 1}",
+        "available_quantity": qty,
+        "availability_status": "out_of_stock" if qty == 0 else "limited" if qty <= 10 else "in_stock",
+        "vendor": rng.choice(VENDORS),
+        "price": round(rng.uniform(1, 30), 2),
+    }
+
+
+def make_user(n: int, n_orders: int, rng: random.Random) -> Dict[str, Any]:
+    return {
+        "user_id": user_id(n),
+        "first_name": rng.choice(FIRST_NAMES),
+        "email": f"user{n + 1}@example.com",
+        "preferred_language": rng.choice(LANGUAGES),
+        "last_order_id": order_id(rng.randrange(n_orders)),
+    }
+
+
+# ----------- Streaming writer --------------------------------------------- #
+
+def _write_array(out, key: str, rows: Iterator[Dict[str, Any]]) -> None:
+    out.write(f',\n  "{key}": [')
+    sep = "\n    "
+    for row in rows:
+        out.write(sep)
+        out.write(json.dumps(row, separators=(",", ":")))
+        sep = ",\n    "
+    out.write("\n  ]")
+
+
+def generate(path: pathlib.Path, n_orders: int, n_products: int, n_users: int, seed: int) -> None:
+    rng = random.Random(seed)
+    today = date.today()
+    with TEMPLATE_FILE.open(encoding="utf-8") as f:
+        edge_cases = json.load(f)["edge_cases"]
+
+    with path.open("w", encoding="utf-8") as out:
+        out.write("{\n")
+        out.write(f'  "generated_at": {json.dumps(str(datetime.now()))}')
+        _write_array(out, "orders", (make_order(i, n_users, rng, today) for i in range(n_orders)))
+        _write_array(out, "products", (make_product(i, rng) for i in range(n_products)))
+        _write_array(out, "users", (make_user(i, n_orders, rng) for i in range(n_users)))
+        _write_array(out, "edge_cases", iter(edge_cases))
+        out.write("\n}\n")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=1_000_000)
+    parser.add_argument("--products", type=int, help="default: orders / 100 (min 15)")
+    parser.add_argument("--users", type=int, help="default: orders / 5 (min 4)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", type=pathlib.Path, default=BASE_DIR / "synthetic_dataset.json")
+    args = parser.parse_args(argv)
+
+    n_products = args.products or max(15, args.orders // 100)
+    n_users = args.users or max(4, args.orders // 5)
+    generate(args.out, args.orders, n_products, n_users, args.seed)
+    print(f"wrote {args.orders} orders, {n_products} products, {n_users} users → {args.out}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,225 @@
+"""
+Mutation journal for the in-memory stores (STATE_DIR).
+"""
+
+import json
+import os
+import pathlib
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from stores import OrderStore
+
+class JournalError(RuntimeError):
+    """A mutation could not be made durable; its undo has already run."""
+
+
+# (record, future, queued at, undo) waiting for the journal writer
+_Pending = Tuple[Dict[str, Any], Future, float, Optional[Callable[[], None]]]
+
+
+class MutationJournal:
+    """Append-only mutation log with group commit and periodic snapshots.
+
+    ``append`` hands a record to a single writer thread and returns a future
+    that resolves once the record is fsync'ed.  Whatever arrives while one
+    fsync is in flight is written and flushed together by the next one, so
+    N concurrent writers pay for far fewer than N disk flushes.
+
+    The snapshot holds only the fields each order has had changed (the
+    overlay on top of DATA_FILE), so it stays small however big the dataset.
+    """
+
+    def __init__(self, directory: pathlib.Path, snapshot_every: int = 50_000):
+        self.dir = directory
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.log_path = self.dir / "mutations.log"
+        self.snapshot_path = self.dir / "snapshot.json"
+        self.snapshot_every = snapshot_every
+        self.overlay: Dict[str, Dict[str, Any]] = {}
+        self.seq = 0
+        self.durable_seq = 0
+        self.snapshot_seq = 0
+        self.stats: Dict[str, Any] = {
+            "commits": 0, "fsyncs": 0, "recovered_mutations": 0, "recovery_seconds": 0.0,
+            "write_errors": 0, "snapshot_errors": 0, "last_error": None,
+        }
+        self._latencies: Deque[float] = deque(maxlen=10_000)
+        self._pending: List[_Pending] = []
+        self._cv = threading.Condition()
+        self._closed = False
+        self._log: Optional[int] = None  # O_APPEND fd, so a torn batch can be truncated away
+        self._log_size = 0
+        self._writer: Optional[threading.Thread] = None
+
+    # .. recovery ...........................................................
+
+    def recover(self, store: OrderStore) -> None:
+        """Re-apply snapshot + log tail to *store*, then start the writer."""
+        started = time.perf_counter()
+        if self.snapshot_path.exists():
+            with self.snapshot_path.open(encoding="utf-8") as f:
+                snap = json.load(f)
+            self.overlay = snap["orders"]
+            self.seq = snap["seq"]
+        replayed = 0
+        if self.log_path.exists():
+            with self.log_path.open(encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        rec = json.loads(line)
+                    except json.JSONDecodeError:
+                        break  # torn final write from a crash; everything after it is lost
+                    if rec["seq"] <= self.seq:
+                        continue
+                    self._apply(rec)
+                    self.seq = rec["seq"]
+                    replayed += 1
+        self.durable_seq = self.seq
+        for order_id, changes in self.overlay.items():
+            if order_id in store:
+                store.update(order_id, changes)
+        # Rewrite the log so a torn tail can't shadow records appended later.
+        self._write_snapshot()
+        self.stats.update(
+            recovered_mutations=replayed,
+            recovered_orders=len(self.overlay),
+            recovery_seconds=round(time.perf_counter() - started, 4),
+        )
+        self._writer = threading.Thread(target=self._run, name="mutation-journal", daemon=True)
+        self._writer.start()
+
+    # .. write path .........................................................
+
+    def append(self, order_id: str, changes: Dict[str, Any], undo: Optional[Callable[[], None]] = None) -> Future:
+        """Queue a mutation.  If it cannot be made durable, *undo* runs on
+        the writer thread before the future fails with JournalError."""
+        fut: Future = Future()
+        with self._cv:
+            if self._closed or (self._writer is not None and not self._writer.is_alive()):
+                raise JournalError("mutation journal is closed")
+            self.seq += 1
+            rec = {"seq": self.seq, "order_id": order_id, "set": changes}
+            self._pending.append((rec, fut, time.perf_counter(), undo))
+            self._cv.notify()
+        return fut
+
+    def _run(self) -> None:
+        while True:
+            with self._cv:
+                while not self._pending and not self._closed:
+                    self._cv.wait()
+                batch, self._pending = self._pending, []
+                if not batch and self._closed:
+                    return
+            try:
+                self._write_log("".join(json.dumps(rec, separators=(",", ":")) + "\n" for rec, _, _, _ in batch))
+            except Exception as exc:
+                self._fail(batch, exc)
+                continue
+            now = time.perf_counter()
+            for rec, fut, queued, _ in batch:
+                self._apply(rec)
+                self._latencies.append(now - queued)
+                fut.set_result(rec["seq"])
+            self.durable_seq = batch[-1][0]["seq"]
+            self.stats["commits"] += len(batch)
+            self.stats["fsyncs"] += 1
+            reset = any(rec["order_id"] is None for rec, _, _, _ in batch)
+            if reset or self.durable_seq - self.snapshot_seq >= self.snapshot_every:
+                try:
+                    self._write_snapshot()
+                except Exception as exc:
+                    # The log still holds everything since the last good
+                    # snapshot; the next batch tries again.
+                    self.stats["snapshot_errors"] += 1
+                    self.stats["last_error"] = f"{type(exc).__name__}: {exc}"
+
+    def _write_log(self, text: str) -> None:
+        data = text.encode("utf-8")
+        view = memoryview(data)
+        try:
+            while view:
+                view = view[os.write(self._log, view):]
+            os.fsync(self._log)
+        except BaseException:
+            # Cut off the partial batch, or replay would stop at it and
+            # lose every record appended after.
+            try:
+                os.ftruncate(self._log, self._log_size)
+            except OSError:
+                pass
+            raise
+        self._log_size += len(data)
+
+    def _fail(self, batch: List[_Pending], exc: Exception) -> None:
+        """Undo and fail every mutation in *batch*; none of it reached the disk."""
+        self.stats["write_errors"] += 1
+        self.stats["last_error"] = f"{type(exc).__name__}: {exc}"
+        for _, fut, _, undo in batch:
+            if undo is not None:
+                try:
+                    undo()
+                except Exception:
+                    pass
+            error = JournalError(self.stats["last_error"])
+            error.__cause__ = exc
+            fut.set_exception(error)
+
+    def _apply(self, rec: Dict[str, Any]) -> None:
+        if rec["order_id"] is None:  # reset() marker
+            self.overlay.clear()
+        else:
+            self.overlay.setdefault(rec["order_id"], {}).update(rec["set"])
+
+    def reset(self) -> Future:
+        """Forget every mutation queued so far (dataset replaced without
+        carry-over); resolves like append() once the marker is durable."""
+        return self.append(None, None)  # type: ignore[arg-type]
+
+    def close(self) -> None:
+        """Drain pending records, snapshot, and stop the writer."""
+        with self._cv:
+            self._closed = True
+            self._cv.notify()
+        if self._writer is not None:
+            self._writer.join()
+            self._write_snapshot()
+            os.close(self._log)
+
+    def report(self) -> Dict[str, Any]:
+        lat = sorted(self._latencies)
+
+        def pct(p: float) -> Optional[float]:
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))] * 1000, 3) if lat else None
+
+        batches = self.stats["fsyncs"]
+        return {
+            **self.stats,
+            "avg_batch": round(self.stats["commits"] / batches, 2) if batches else None,
+            "commit_ms_p50": pct(0.50),
+            "commit_ms_p99": pct(0.99),
+            "seq": self.durable_seq,
+        }
+
+    def _write_snapshot(self) -> None:
+        # Only called from recover() or the writer thread, so overlay and
+        # durable_seq describe exactly what has reached the disk.
+        seq = self.durable_seq
+        tmp = self.snapshot_path.with_suffix(".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            json.dump({"seq": seq, "orders": self.overlay}, f, separators=(",", ":"))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.snapshot_path)
+        # Only switch logs once the new one is open: if that fails, the old
+        # log stays in use and still replays on top of the new snapshot.
+        log = os.open(self.log_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | os.O_APPEND, 0o644)
+        if self._log is not None:
+            os.close(self._log)
+        self._log, self._log_size = log, 0
+        self.snapshot_seq = seq
+        os.fsync(log)
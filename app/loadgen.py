@@ -0,0 +1,268 @@
+"""
+Load generator
+—————————————
+Simulates concurrent Retell calls against a running instance of main.py and
+reports throughput and p50/p95/p99 latency per tool.
+
+Each virtual call picks one of the dataset's `edge_cases` and replays the
+tool sequence that scenario implies (missing order id, cancel after
+dispatch, refund not eligible, …), using real order ids of the right kind
+from the same dataset the server was started with.  One keep-alive
+connection per call, stdlib only.
+
+    uvicorn main:app --port 8000 &
+    python loadgen.py --calls 500 --duration 30
+    python loadgen.py --calls 1000 --duration 60 --think-ms 50 --json > run.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import pathlib
+import random
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+BASE_DIR = pathlib.Path(__file__).parent
+DEFAULT_DATA_FILE = pathlib.Path(os.getenv("DATA_FILE", BASE_DIR / "retell_mock_full_dataset.json"))
+
+Step = Tuple[str, Dict[str, Any]]
+
+
+# ----------- Scenarios ---------------------------------------------------- #
+
+class Pools:
+    """Order/product ids from the dataset, grouped by what a scenario needs."""
+
+    def __init__(self, data: Dict[str, Any], rng: random.Random):
+        orders = data["orders"]
+        self.rng = rng
+        self.any = [o["order_id"] for o in orders]
+        self.dispatched = [o["order_id"] for o in orders if o["status"] in {"dispatched", "delivered"}] or self.any
+        self.cancellable = [o["order_id"] for o in orders if o["can_cancel"]] or self.any
+        self.not_refundable = [o["order_id"] for o in orders if not o["eligible_for_refund"]] or self.any
+        self.products = [(p["product_name"], p["vendor"]) for p in data.get("products", [])] or [("Product 1", None)]
+        self.emails = [u["email"] for u in data.get("users", []) if u.get("email")] or ["user1@example.com"]
+
+    def pick(self, pool: List[Any]) -> Any:
+        return self.rng.choice(pool)
+
+
+def _opening() -> List[Step]:
+    return [("get_current_datetime", {})]
+
+
+def _closing(p: Pools, summary: str) -> List[Step]:
+    return [("log_call", {"summary": summary, "sentiment": p.rng.choice(["positive", "neutral", "negative"])}),
+            ("end_call", {})]
+
+
+def _status_check(p: Pools) -> List[Step]:
+    return [("check_order_status", {"order_id": p.pick(p.any)})]
+
+
+# scenario name (edge_cases[].scenario) → tool sequence for one call
+SCENARIOS: Dict[str, Callable[[Pools], List[Step]]] = {
+    "order_without_id": lambda p: [
+        *_opening(),
+        ("check_order_status", {}),
+        ("find_orders_for_user", {"email": p.pick(p.emails)}),
+        *_status_check(p),
+        *_closing(p, "status without id"),
+    ],
+    "cancel_after_dispatch": lambda p: [
+        *_opening(),
+        ("check_order_status", {"order_id": (oid := p.pick(p.dispatched))}),
+        ("cancel_order", {"order_id": oid}),
+        ("create_ticket", {"order_id": oid, "reason": "cancel after dispatch"}),
+        *_closing(p, "cancel refused"),
+    ],
+    "refund_not_eligible": lambda p: [
+        *_opening(),
+        ("check_order_status", {"order_id": (oid := p.pick(p.not_refundable))}),
+        ("request_refund", {"order_id": oid, "reason": "changed mind"}),
+        *_closing(p, "refund refused"),
+    ],
+    "multiple_intents": lambda p: [
+        *_opening(),
+        ("cancel_order", {"order_id": (oid := p.pick(p.cancellable))}),
+        ("request_refund", {"order_id": oid, "reason": "cancelled"}),
+        *_closing(p, "cancel and refund"),
+    ],
+    "invalid_product": lambda p: [
+        *_opening(),
+        ("check_product_availability", {"product_name": "Product does-not-exist"}),
+        ("check_product_availability", {"product_name": (prod := p.pick(p.products))[0], "vendor": prod[1]}),
+        *_closing(p, "product question"),
+    ],
+    "policy_ask": lambda p: [
+        *_opening(),
+        ("create_ticket", {"reason": "policy question", "escalate": True}),
+        *_closing(p, "escalated"),
+    ],
+    "angry_customer": lambda p: [
+        *_opening(),
+        *_status_check(p),
+        ("create_ticket", {"reason": "customer upset", "priority": "high"}),
+        *_closing(p, "angry customer"),
+    ],
+}
+# ASR / language trouble doesn't change which tools run, just the wording.
+DEFAULT_SCENARIO: Callable[[Pools], List[Step]] = lambda p: [*_opening(), *_status_check(p), *_closing(p, "routine")]
+
+
+# ----------- HTTP --------------------------------------------------------- #
+
+class Connection:
+    """Minimal HTTP/1.1 keep-alive client for JSON POSTs."""
+
+    def __init__(self, host: str, port: int):
+        self.host, self.port = host, port
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def post(self, path: str, payload: Dict[str, Any]) -> Tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        body = json.dumps(payload).encode()
+        self.writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode() + body
+        )
+        await self.writer.drain()
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        status = int(lines[0].split()[1])
+        headers = {k.lower(): v.strip() for k, _, v in (ln.partition(":") for ln in lines[1:] if ln)}
+        data = await self.reader.readexactly(int(headers.get("content-length", 0)))
+        if headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, data
+
+    async def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+
+
+# ----------- Runner ------------------------------------------------------- #
+
+class Results:
+    def __init__(self) -> None:
+        self.latency: Dict[str, List[float]] = {}
+        self.tool_errors: Dict[str, int] = {}  # ok=false envelopes (often expected)
+        self.failures: Dict[str, int] = {}  # transport errors / non-200
+        self.scenarios: Dict[str, int] = {}
+
+    def summary(self, elapsed: float) -> Dict[str, Any]:
+        def pct(xs: List[float], p: float) -> float:
+            return round(xs[min(len(xs) - 1, int(p * len(xs)))] * 1000, 2)
+
+        tools = {}
+        for name, xs in sorted(self.latency.items()):
+            xs.sort()
+            tools[name] = {
+                "count": len(xs),
+                "rps": round(len(xs) / elapsed, 1),
+                "p50_ms": pct(xs, 0.50),
+                "p95_ms": pct(xs, 0.95),
+                "p99_ms": pct(xs, 0.99),
+                "tool_errors": self.tool_errors.get(name, 0),
+                "failures": self.failures.get(name, 0),
+            }
+        total = sum(len(xs) for xs in self.latency.values())
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "requests": total,
+            "rps": round(total / elapsed, 1),
+            "scenarios": dict(sorted(self.scenarios.items())),
+            "tools": tools,
+        }
+
+
+async def virtual_call_loop(
+    host: str, port: int, pools: Pools, scenarios: List[str], results: Results, stop_at: float, think: float
+) -> None:
+    conn = Connection(host, port)
+    try:
+        while time.perf_counter() < stop_at:
+            name = pools.rng.choice(scenarios)
+            results.scenarios[name] = results.scenarios.get(name, 0) + 1
+            for tool, args in SCENARIOS.get(name, DEFAULT_SCENARIO)(pools):
+                started = time.perf_counter()
+                try:
+                    status, body = await conn.post(f"/{tool}", {"args": args})
+                except (OSError, asyncio.IncompleteReadError, ValueError):
+                    results.failures[tool] = results.failures.get(tool, 0) + 1
+                    await conn.close()
+                    continue
+                results.latency.setdefault(tool, []).append(time.perf_counter() - started)
+                if status != 200:
+                    results.failures[tool] = results.failures.get(tool, 0) + 1
+                elif not json.loads(body).get("ok"):
+                    results.tool_errors[tool] = results.tool_errors.get(tool, 0) + 1
+                if think:
+                    await asyncio.sleep(pools.rng.uniform(0, 2 * think))
+    finally:
+        await conn.close()
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    with args.data_file.open(encoding="utf-8") as f:
+        data = json.load(f)
+    pools = Pools(data, random.Random(args.seed))
+    scenarios = [e["scenario"] for e in data.get("edge_cases", [])] or list(SCENARIOS)
+    results = Results()
+    started = time.perf_counter()
+    stop_at = started + args.duration
+    await asyncio.gather(
+        *(
+            virtual_call_loop(args.host, args.port, pools, scenarios, results, stop_at, args.think_ms / 1000)
+            for _ in range(args.calls)
+        )
+    )
+    return results.summary(time.perf_counter() - started)
+
+
+def print_table(summary: Dict[str, Any]) -> None:
+    print(f"{summary['requests']} requests in {summary['elapsed_s']} s → {summary['rps']} req/s")
+    print(f"{'tool':<28}{'count':>8}{'rps':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'tool_err':>10}{'fail':>6}")
+    for name, t in summary["tools"].items():
+        print(
+            f"{name:<28}{t['count']:>8}{t['rps']:>9}{t['p50_ms']:>9}{t['p95_ms']:>9}{t['p99_ms']:>9}"
+            f"{t['tool_errors']:>10}{t['failures']:>6}"
+        )
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--calls", type=int, default=100, help="concurrent virtual calls (connections)")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="mean pause between tool calls")
+    parser.add_argument("--data-file", type=pathlib.Path, default=DEFAULT_DATA_FILE)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        import uvloop  # shipped with uvicorn[standard]
+
+        uvloop.install()
+    except ImportError:
+        pass
+    summary = asyncio.run(run(args))
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    else:
+        print_table(summary)
+    failed = sum(t["failures"] for t in summary["tools"].values())
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
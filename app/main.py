@@ -5,43 +5,320 @@ FastAPI service that implements the function‑tool contract Retell.ai expects.
 It loads mock data from retell_mock_full_dataset.json that lives **next to
 this file** by default, but the path can be overridden with DATA_FILE env‑var.
 
-Version 1.1 — identical to the proven‑stable build except for ONE addition:
-    • **/end_call** endpoint that lets the LLM hang up gracefully by returning
-      `{ "ok": true, "data": { "hang_up": true } }`
-All other behaviour, helpers, and payload formats remain untouched.
+Version 1.1 added **/end_call**, which lets the LLM hang up gracefully by
+returning `{ "ok": true, "data": { "hang_up": true } }`.
+
+Since then: pluggable order stores, a mutation journal, async execution,
+/batch, a call-log/ticket sink, hot reload, indexed lookup tools, a response
+cache and /metrics.  Each is opt-in through env-vars (see README.md); with
+none set, the 1.1 tools and payload formats behave as before.
+
+Large datasets: set STORE_MODE=compact (slotted in-memory records) or
+STORE_MODE=sqlite (indexed on-disk copy, built once, opened in milliseconds).
+generate_dataset.py produces multi-million-order files with the same schema.
+
+This module holds the configuration, the endpoints and the wiring; the
+moving parts live next to it: stores.py (ORDERS / CATALOG), journal.py
+(STATE_DIR), sink.py (SINK_DIR), cache.py (RESPONSE_CACHE_MB) and
+metrics.py (/metrics).
 """
 
+import asyncio
+import fcntl
+import functools
+import hashlib
 import json
 import os
 import pathlib
+import sys
+import tempfile
+import threading
+import time
 import uuid
+from concurrent.futures import Future
+from contextlib import asynccontextmanager, nullcontext
+from contextvars import ContextVar
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import IO, Any, Callable, Dict, List, Mapping, Optional, Tuple
 
-from fastapi import FastAPI
+import anyio.to_thread
+from fastapi import FastAPI, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from pydantic import BaseModel, Field
 
+from cache import ResponseCache
+from journal import JournalError, MutationJournal
+from metrics import IN_FLIGHT, LOOP_LAG, REQUEST_LATENCY, MetricsMiddleware, measure_loop_lag
+from sink import RecordSink
+from stores import OrderStore, load_dataset, sqlite_path
+
+try:  # optional: ~5-10× faster encoding for the response cache
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj)
+
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+
+    def dumps(obj: Any) -> bytes:
+        # Same bytes Starlette's JSONResponse would produce.
+        return json.dumps(obj, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
 # --------------------------------------------------------------------------- #
 # ••• DATA LOADING •••
 # --------------------------------------------------------------------------- #
 BASE_DIR = pathlib.Path(__file__).parent
 DATA_FILE = pathlib.Path(os.getenv("DATA_FILE", BASE_DIR / "retell_mock_full_dataset.json")).resolve()
 
+# memory | compact | sqlite, see stores.py
+STORE_MODE = os.getenv("STORE_MODE", "memory").lower()
+STORE_PATH = os.getenv("STORE_PATH")
+
 if not DATA_FILE.exists():
     raise RuntimeError(
         f"❌  DATA_FILE not found at {DATA_FILE}. "
         "Mount it there or export DATA_FILE=/absolute/path.json"
     )
 
-with DATA_FILE.open(encoding="utf-8") as f:
-    DATA: Dict[str, Any] = json.load(f)
 
-ORDERS = {o["order_id"]: o for o in DATA["orders"]}
+def _claim_data_file(path: pathlib.Path) -> IO[str]:
+    """Lock *path* for this process's lifetime.  Worker processes with an
+    in-memory store would each keep their own orders and never see the
+    others' writes, so the second one (``uvicorn --workers N``, gunicorn …)
+    refuses to start.  Nothing reliable in the environment says how many
+    workers a server spawned; a lock held by a live process does."""
+    digest = hashlib.sha1(str(path).encode("utf-8")).hexdigest()[:16]
+    lock = open(pathlib.Path(tempfile.gettempdir()) / f"volt-mock-{digest}.lock", "w")
+    try:
+        fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        lock.close()
+        raise RuntimeError(
+            f"❌  Another process already serves {path} with STORE_MODE={STORE_MODE}. "
+            "Multiple workers need STORE_MODE=sqlite to share order state; "
+            "independent instances need their own copy of DATA_FILE."
+        ) from None
+    return lock
+
+
+_DATA_FILE_LOCK = None if STORE_MODE == "sqlite" else _claim_data_file(DATA_FILE)
+
+
+def _fingerprint(path: pathlib.Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+class Snapshot:
+    """One loaded dataset.  Reloads build a new Snapshot and swap it in
+    whole; ``DATA`` / ``ORDERS`` / ``CATALOG`` always belong to the current one."""
+
+    def __init__(
+        self, version: int, path: pathlib.Path, fresh: bool = False, carry_from: Optional[OrderStore] = None
+    ):
+        started = time.perf_counter()
+        self.version = version
+        self.path = path
+        self.fingerprint = _fingerprint(path)  # before loading: a write meanwhile still counts as a change
+        self.data, self.orders = load_dataset(path, STORE_MODE, fresh, carry_from, STORE_PATH)
+        self.catalog = self.orders.catalog(self.data)
+        self.load_seconds = round(time.perf_counter() - started, 4)
+        self.loaded_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "data_file": str(self.path),
+            "loaded_at": self.loaded_at,
+            "load_seconds": self.load_seconds,
+        }
+
+
+SNAPSHOT = Snapshot(1, DATA_FILE)
+DATA, ORDERS, CATALOG = SNAPSHOT.data, SNAPSHOT.orders, SNAPSHOT.catalog
+
+# --------------------------------------------------------------------------- #
+# ••• PERSISTENCE •••
+# --------------------------------------------------------------------------- #
+# Unset STATE_DIR keeps the original in-memory-only behaviour.
+STATE_DIR = os.getenv("STATE_DIR")
+SNAPSHOT_EVERY = int(os.getenv("SNAPSHOT_EVERY", "50000"))
+JOURNAL: Optional[MutationJournal] = None
+if STATE_DIR:
+    if ORDERS.mode == "sqlite":
+        # The SQLite file is already durable; a second log would only add fsyncs.
+        print("ℹ️  STATE_DIR ignored with STORE_MODE=sqlite (mutations persist in the store)", file=sys.stderr)
+    else:
+        JOURNAL = MutationJournal(pathlib.Path(STATE_DIR), SNAPSHOT_EVERY)
+        JOURNAL.recover(ORDERS)
+
+# --------------------------------------------------------------------------- #
+# ••• CALL LOG / TICKET SINK •••
+# --------------------------------------------------------------------------- #
+# Unset SINK_DIR keeps the original echo-only behaviour.
+SINK_DIR = os.getenv("SINK_DIR")
+SINK_QUEUE_SIZE = int(os.getenv("SINK_QUEUE_SIZE", "10000"))
+SINK_POLICY = os.getenv("SINK_POLICY", "block").lower()  # block | drop | sample
+SINK_BLOCK_SECONDS = float(os.getenv("SINK_BLOCK_SECONDS", "1.0"))
+SINK_SAMPLE_RATE = float(os.getenv("SINK_SAMPLE_RATE", "0.1"))
+SINK_BATCH_SIZE = int(os.getenv("SINK_BATCH_SIZE", "1000"))
+SINK_FLUSH_SECONDS = float(os.getenv("SINK_FLUSH_SECONDS", "1.0"))
+SINK_ROTATE_BYTES = int(float(os.getenv("SINK_ROTATE_MB", "64")) * 1024 * 1024)
+
+SINK: Optional[RecordSink] = None
+if SINK_DIR:
+    SINK = RecordSink(
+        pathlib.Path(SINK_DIR),
+        policy=SINK_POLICY,
+        queue_size=SINK_QUEUE_SIZE,
+        block_seconds=SINK_BLOCK_SECONDS,
+        sample_rate=SINK_SAMPLE_RATE,
+        batch_size=SINK_BATCH_SIZE,
+        flush_seconds=SINK_FLUSH_SECONDS,
+        rotate_bytes=SINK_ROTATE_BYTES,
+    )
+
+# --------------------------------------------------------------------------- #
+# ••• RESPONSE CACHE •••
+# --------------------------------------------------------------------------- #
+# 0 disables; otherwise the LRU bound for pre-encoded check_order_status bodies.
+RESPONSE_CACHE_MB = float(os.getenv("RESPONSE_CACHE_MB", "64"))
+RESPONSE_CACHE: Optional[ResponseCache] = (
+    ResponseCache(int(RESPONSE_CACHE_MB * 1024 * 1024)) if RESPONSE_CACHE_MB > 0 else None
+)
+# Held from reading ORDERS.changed_orders() until they are out of the cache,
+# so no thread takes a token while another still has changes to apply.
+_CACHE_SYNC_LOCK = threading.Lock()
+
+# --------------------------------------------------------------------------- #
+# ••• HOT RELOAD •••
+# --------------------------------------------------------------------------- #
+# RELOAD_WATCH=1 polls DATA_FILE and reloads when it changes; POST
+# /admin/reload does the same on demand (optionally with another file).  That
+# route exists only with ADMIN_RELOAD=1: it swaps what every caller sees and
+# has no authentication of its own.
+RELOAD_WATCH = os.getenv("RELOAD_WATCH", "0") == "1"
+ADMIN_RELOAD = os.getenv("ADMIN_RELOAD", "0") == "1"
+RELOAD_POLL_SECONDS = float(os.getenv("RELOAD_POLL_SECONDS", "2"))
+RELOAD_CARRY_MUTATIONS = os.getenv("RELOAD_CARRY_MUTATIONS", "1") == "1"
+
+# Every mutation since start-up (or since a reload without carry-over), so a
+# reload can re-apply them to the new dataset.  Durable stores (sqlite) keep
+# their own and leave this empty.  mutate() holds _MUTATION_LOCK across its
+# compare-and-set and the swap holds it too, so each mutation lands in
+# exactly one snapshot: before the copy, or in the new one after the swap.
+_MUTATIONS: Dict[str, Dict[str, Any]] = {k: dict(v) for k, v in JOURNAL.overlay.items()} if JOURNAL else {}
+_MUTATION_LOCK = threading.RLock()
+_RELOAD_LOCK = threading.Lock()
+_RELOAD_STATUS: Dict[str, Any] = {"reloads": 0, "last_error": None}
+
+
+def reload_dataset(path: Optional[pathlib.Path] = None, carry_mutations: bool = RELOAD_CARRY_MUTATIONS) -> Snapshot:
+    """Load *path* (default: the current file) and swap it in atomically.
+
+    Parsing and indexing happen before the swap, on the caller's thread, so
+    requests keep being served from the old snapshot meanwhile.  A durable
+    store rebuilds its file in place, so its own transaction orders our
+    writes around the rebuild; only when the new dataset goes to another
+    file are the old file's mutations copied over, and then this worker's
+    writes (not reads) wait for the build.  A file that fails to load
+    leaves the old snapshot in place and raises.
+    """
+    global SNAPSHOT, DATA, ORDERS, CATALOG
+    with _RELOAD_LOCK:
+        old = SNAPSHOT
+        path = (path or old.path).resolve()
+        carry_in_store = carry_mutations and old.orders.durable
+        copying = carry_in_store and sqlite_path(path, STORE_PATH) != old.orders.path  # type: ignore[attr-defined]
+        with _MUTATION_LOCK if copying else nullcontext():
+            try:
+                if not path.exists():
+                    raise RuntimeError(f"DATA_FILE not found at {path}")
+                new = Snapshot(
+                    old.version + 1, path, fresh=not carry_mutations, carry_from=old.orders if carry_in_store else None
+                )
+            except Exception as exc:
+                _RELOAD_STATUS["last_error"] = f"{type(exc).__name__}: {exc}"
+                raise
+            with _MUTATION_LOCK:
+                # Queued under the lock mutate() queues its records under,
+                # so the marker splits them exactly where the swap does.
+                reset = JOURNAL.reset() if not carry_mutations and JOURNAL is not None else None
+                if not carry_mutations:
+                    _MUTATIONS.clear()
+                elif not carry_in_store:
+                    for order_id, changes in _MUTATIONS.items():
+                        if order_id in new.orders:
+                            new.orders.update(order_id, changes)
+                if RESPONSE_CACHE is not None:
+                    RESPONSE_CACHE.clear()
+                SNAPSHOT = new
+                DATA, ORDERS, CATALOG = new.data, new.orders, new.catalog
+        _RELOAD_STATUS["reloads"] += 1
+        _RELOAD_STATUS["last_error"] = None
+        if reset is not None:
+            # Waited for outside _MUTATION_LOCK: the writer thread takes it
+            # to undo a failed batch.
+            try:
+                reset.result()
+            except JournalError as exc:
+                # The swap stands, but a restart would replay the old mutations.
+                _RELOAD_STATUS["last_error"] = f"journal reset not persisted: {exc}"
+                print(f"⚠️  {_RELOAD_STATUS['last_error']}", file=sys.stderr)
+        return new
+
+
+def _watch_data_file(stop: threading.Event) -> None:
+    failed = None  # a file that didn't load is only retried once it changes again
+    while not stop.wait(RELOAD_POLL_SECONDS):
+        snap = SNAPSHOT  # compared with the file it was loaded from, wherever that is
+        current = _fingerprint(snap.path)
+        if current is None or current in (snap.fingerprint, failed):
+            continue
+        # Wait for the writer to finish: reload only once the file has
+        # stopped changing for a full poll interval.
+        if stop.wait(RELOAD_POLL_SECONDS) or _fingerprint(snap.path) != current:
+            continue
+        if SNAPSHOT is not snap:  # /admin/reload got there first
+            continue
+        try:
+            reload_dataset()
+        except Exception as exc:
+            failed = current
+            print(f"⚠️  reload of {snap.path} failed: {exc}", file=sys.stderr)
 
 # --------------------------------------------------------------------------- #
 # ••• FASTAPI APP •••
 # --------------------------------------------------------------------------- #
-app = FastAPI(title="Volt Retell Mock Functions")
+# threadpool – plain `def` handlers, each call hops to AnyIO's 40-thread pool
+# async      – handlers run inline on the event loop; journal fsyncs are
+#              awaited and blocking stores (sqlite) still go to the pool
+EXEC_MODE = os.getenv("EXEC_MODE", "threadpool").lower()
+if EXEC_MODE not in {"threadpool", "async"}:
+    raise RuntimeError(f"❌  Unknown EXEC_MODE {EXEC_MODE!r}; use threadpool or async")
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    stop = threading.Event()
+    if RELOAD_WATCH:
+        threading.Thread(target=_watch_data_file, args=(stop,), name="data-file-watch", daemon=True).start()
+    lag_probe = asyncio.create_task(measure_loop_lag())
+    yield
+    lag_probe.cancel()
+    stop.set()
+    if JOURNAL is not None:
+        JOURNAL.close()
+    if SINK is not None:
+        SINK.close()
+
+
+app = FastAPI(title="Volt Retell Mock Functions", lifespan=lifespan)
+app.add_middleware(MetricsMiddleware)
 
 
 # ----------- Helper -------------------------------------------------------- #
@@ -54,8 +331,197 @@ def tool_err(message: str, code: int = 400) -> Dict[str, Any]:
     return {"ok": False, "error": {"code": code, "message": message}}
 
 
-def save():  # In-memory only for mock; extend if persistence is required
-    pass
+def _require_strings(args: Dict[str, Any], *names: str) -> Optional[Dict[str, Any]]:
+    """tool_err for the first of *names* that is given but not a string."""
+    for name in names:
+        if args.get(name) is not None and not isinstance(args[name], str):
+            return tool_err(f"{name} must be a string", 400)
+    return None
+
+
+# What a tool answers when the journal could not make its change durable.
+PERSIST_FAILED = "Could not persist change"
+
+# Set by run_tool(): commits to await after the handler returns, instead of
+# blocking the calling thread (which, in async mode, is the event loop).
+_PENDING_COMMITS: ContextVar[Optional[List[Future]]] = ContextVar("_PENDING_COMMITS", default=None)
+
+
+def mutate(
+    order_id: Optional[str], allowed: Callable[[Mapping[str, Any]], bool], changes: Dict[str, Any]
+) -> Tuple[Optional[Mapping[str, Any]], bool]:
+    """``ORDERS.transition()`` followed, if it applied, by save()."""
+    previous: Dict[str, Any] = {}
+
+    def check(order: Mapping[str, Any]) -> bool:
+        if not allowed(order):
+            return False
+        previous.update((k, order.get(k)) for k in changes)  # runs under the store's lock
+        return True
+
+    # See _MUTATIONS: a reload can't swap in between, and the journal record
+    # is queued on the same side of a reload's reset marker as the change.
+    with _MUTATION_LOCK:
+        store = ORDERS
+        order, applied = store.transition(order_id, check, changes)
+        if not applied:
+            return order, False
+        if not store.durable:
+            _MUTATIONS.setdefault(order_id, {}).update(changes)
+        commit = None
+        if JOURNAL is not None:
+            undo = functools.partial(_undo, store, order_id, changes, previous)
+            try:
+                commit = JOURNAL.append(order_id, changes, undo=undo)  # type: ignore[arg-type]
+            except JournalError:  # writer gone: nothing queued, so undo here
+                undo()
+                raise
+    save(order_id, commit)  # type: ignore[arg-type]
+    return order, True
+
+
+def save(order_id: str, commit: Optional[Future]) -> None:
+    """Wait for a mutation mutate() just applied to be durable (only with
+    STATE_DIR).  If the journal cannot persist it, the change is reverted
+    before the error reaches the caller, so memory never holds a state that
+    a restart would lose; the error is a JournalError (see persisted())."""
+    if RESPONSE_CACHE is not None:
+        RESPONSE_CACHE.invalidate(order_id)
+    if commit is None:
+        return
+    pending = _PENDING_COMMITS.get()
+    if pending is None:
+        commit.result()
+    else:
+        pending.append(commit)
+
+
+def _undo(store: OrderStore, order_id: str, changes: Dict[str, Any], previous: Dict[str, Any]) -> None:
+    """Revert a mutation the journal failed to persist.  Fields that no
+    longer hold our values were changed again since and are left alone,
+    and so is a snapshot that replaced *store* meanwhile."""
+    with _MUTATION_LOCK:
+        if store is not ORDERS:
+            return
+        store.transition(order_id, lambda o: all(o.get(k) == v for k, v in changes.items()), previous)
+        entry = _MUTATIONS.get(order_id, {})
+        durable = JOURNAL.overlay.get(order_id, {}) if JOURNAL is not None else {}
+        for k, v in changes.items():
+            if entry.get(k) != v:
+                continue
+            if k in durable:
+                entry[k] = durable[k]
+            else:
+                entry.pop(k)
+        if not entry:
+            _MUTATIONS.pop(order_id, None)
+    if RESPONSE_CACHE is not None:
+        RESPONSE_CACHE.invalidate(order_id)
+
+
+async def run_tool(fn: Callable[..., Dict[str, Any]], *args: Any, **kwargs: Any) -> Dict[str, Any]:
+    """Run a sync tool handler from a coroutine (async endpoints, /batch).
+
+    In threadpool mode every handler goes to the thread pool, exactly as
+    its own sync endpoint would.  In async mode memory stores answer in
+    microseconds, so the handler runs inline: with no await between its
+    check and its write it cannot interleave with another request.
+    Handlers registered as ``blocking`` (and every handler on a blocking
+    store) go to the thread pool in both modes.  Any journal commit
+    it queued is awaited before the response goes out, so "ok" still means
+    "durable".
+    """
+    pending: List[Future] = []
+    token = _PENDING_COMMITS.set(pending)
+    try:
+        if EXEC_MODE == "threadpool" or ORDERS.blocking or getattr(fn, "blocking", False):
+            result = await run_in_threadpool(fn, *args, **kwargs)
+        else:
+            result = fn(*args, **kwargs)
+    finally:
+        _PENDING_COMMITS.reset(token)
+    try:
+        for fut in pending:
+            await asyncio.wrap_future(fut)
+    except JournalError:
+        return tool_err(PERSIST_FAILED, 503)
+    return result
+
+
+def persisted(fn: Callable[..., Dict[str, Any]]) -> Callable[..., Dict[str, Any]]:
+    """Answer 503 instead of 500 when the journal could not persist a
+    mutation (full disk …); save() has already undone it."""
+
+    @functools.wraps(fn)
+    def handler(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+        try:
+            return fn(*args, **kwargs)
+        except JournalError:
+            return tool_err(PERSIST_FAILED, 503)
+
+    return handler
+
+
+# name → sync handler, for /batch
+TOOLS: Dict[str, Callable[..., Dict[str, Any]]] = {}
+
+
+def sync_response_cache() -> int:
+    """Drop the orders other workers changed from RESPONSE_CACHE; returns a
+    token for put()."""
+    with _CACHE_SYNC_LOCK:
+        return RESPONSE_CACHE.token(ORDERS.changed_orders())
+
+
+def cached_by_order(fn: Callable[..., Dict[str, Any]]) -> Callable[..., Response]:
+    """Serve *fn*'s successful responses from RESPONSE_CACHE, keyed by
+    ``args.order_id``; *fn* must depend on nothing else."""
+
+    @functools.wraps(fn)
+    def handler(payload: ArgsWrapper) -> Response:
+        order_id = payload.args.get("order_id")
+        if not isinstance(order_id, str):
+            return Response(dumps(fn(payload)), media_type="application/json")
+        token = sync_response_cache()
+        body = RESPONSE_CACHE.get(order_id)
+        if body is None:
+            result = fn(payload)
+            body = dumps(result)
+            # Another worker may have committed while we read; dropping what
+            # it changed moves the generation on, and put() then refuses.
+            sync_response_cache()
+            if result["ok"]:
+                RESPONSE_CACHE.put(order_id, body, token)
+        return Response(body, media_type="application/json")
+
+    return handler
+
+
+def tool(path: str, cache_by_order: bool = False, blocking: bool = False):
+    """Register a tool handler at POST *path* according to EXEC_MODE.
+
+    With *cache_by_order* the HTTP route answers from RESPONSE_CACHE;
+    /batch always calls the plain handler.  *blocking* handlers may wait
+    (on a full sink queue, a lock held across disk I/O …) and so never run
+    on the event loop.
+    """
+
+    def register(fn: Callable[..., Dict[str, Any]]):
+        fn = persisted(fn)
+        fn.blocking = blocking  # type: ignore[attr-defined]
+        TOOLS[path.lstrip("/")] = fn
+        handler = cached_by_order(fn) if cache_by_order and RESPONSE_CACHE is not None else fn
+        endpoint = handler
+        if EXEC_MODE == "async":
+
+            @functools.wraps(handler)
+            async def endpoint(*args: Any, **kwargs: Any) -> Dict[str, Any]:
+                return await run_tool(handler, *args, **kwargs)
+
+        app.post(path)(endpoint)
+        return fn
+
+    return register
 
 
 # ----------- Request / Response Schemas ----------------------------------- #
@@ -69,7 +535,7 @@ class ArgsWrapper(BaseModel):
 # ••• FUNCTION ENDPOINTS •••
 # --------------------------------------------------------------------------- #
 
-@app.post("/check_order_status")
+@tool("/check_order_status", cache_by_order=True)
 def check_order_status(payload: ArgsWrapper):
     order_id = payload.args.get("order_id")
     order = ORDERS.get(order_id)
@@ -85,34 +551,35 @@ def check_order_status(payload: ArgsWrapper):
     )
 
 
-@app.post("/cancel_order")
+@tool("/cancel_order")
 def cancel_order(payload: ArgsWrapper):
     order_id = payload.args.get("order_id")
-    order = ORDERS.get(order_id)
+    changes = {"status": "cancelled", "can_cancel": False}
+    order, applied = mutate(
+        order_id,
+        lambda o: o["can_cancel"] and o["status"] not in {"dispatched", "delivered", "cancelled"},
+        changes,
+    )
     if not order:
         return tool_err(f"Order {order_id} not found", 404)
-    if not order["can_cancel"] or order["status"] in {"dispatched", "delivered", "cancelled"}:
+    if not applied:
         return tool_err("Order can no longer be cancelled", 400)
 
-    order["status"] = "cancelled"
-    order["can_cancel"] = False
-    save()
     return tool_ok({"order_id": order_id, "message": "Order cancelled successfully"})
 
 
-@app.post("/request_refund")
+@tool("/request_refund")
 def request_refund(payload: ArgsWrapper):
     order_id = payload.args.get("order_id")
     reason = payload.args.get("reason", "unspecified")
-    order = ORDERS.get(order_id)
+    changes = {"eligible_for_refund": False}
+    order, applied = mutate(order_id, lambda o: o["eligible_for_refund"], changes)
     if not order:
         return tool_err(f"Order {order_id} not found", 404)
-    if not order["eligible_for_refund"]:
+    if not applied:
         return tool_err("Order not eligible for refund", 400)
 
     refund_amount = round(sum(i["qty"] * 5 for i in order["items"]), 2)  # mock calc
-    order["eligible_for_refund"] = False
-    save()
     return tool_ok(
         {
             "order_id": order_id,
@@ -123,41 +590,284 @@ def request_refund(payload: ArgsWrapper):
     )
 
 
-@app.post("/create_ticket")
+@tool("/create_ticket", blocking=SINK is not None)
 def create_ticket(payload: ArgsWrapper):
     ticket_id = f"volt-{uuid.uuid4().hex[:8]}"
-    return tool_ok(
-        {
-            "ticket_id": ticket_id,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "details": payload.args,
-        }
-    )
-
-
-@app.post("/log_call")
+    ticket = {
+        "ticket_id": ticket_id,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "details": payload.args,
+    }
+    # Like log_call: "stored" is False if the sink's queue was full.
+    stored = SINK.submit("ticket", ticket) if SINK is not None else True
+    return tool_ok({**ticket, "stored": stored})
+
+
+@tool("/get_ticket", blocking=SINK is not None)
+def get_ticket(payload: ArgsWrapper):
+    err = _require_strings(payload.args, "ticket_id")
+    if err:
+        return err
+    ticket_id = payload.args.get("ticket_id")
+    ticket = SINK.ticket(ticket_id) if SINK is not None and ticket_id else None
+    if not ticket:
+        return tool_err(f"Ticket {ticket_id} not found", 404)
+    return tool_ok(ticket)
+
+
+@tool("/log_call", blocking=SINK is not None)
 def log_call(payload: ArgsWrapper):
-    # Normally you'd push to Slack / DB; here we just echo.
-    return tool_ok({"stored": True, "received": payload.args})
+    # Without SINK_DIR there is nowhere to keep it; we just echo.
+    stored = True
+    if SINK is not None:
+        stored = SINK.submit("call", {"logged_at": datetime.now(timezone.utc).isoformat(), "call": payload.args})
+    return tool_ok({"stored": stored, "received": payload.args})
 
 
-@app.post("/get_current_datetime")
+@tool("/get_current_datetime")
 def get_current_datetime(_: ArgsWrapper):
     now = datetime.now(timezone.utc)
     return tool_ok({"date": now.date().isoformat(), "time": now.time().isoformat(timespec="seconds")})
 
 
+# ----------- Indexed lookups ---------------------------------------------- #
+
+def _limit(raw: Any, default: int = 5, ceiling: int = 50) -> int:
+    try:
+        return max(1, min(int(raw), ceiling))
+    except (TypeError, ValueError):
+        return default
+
+
+def _order_summary(order: Mapping[str, Any]) -> Dict[str, Any]:
+    return {
+        "order_id": order["order_id"],
+        "status": order["status"],
+        "vendor_name": order["vendor_name"],
+        "order_type": order["order_type"],
+        "delivery_eta": order["delivery_eta"],
+        "delivered_at": order["delivered_at"],
+        "can_cancel": order["can_cancel"],
+        "eligible_for_refund": order["eligible_for_refund"],
+    }
+
+
+@tool("/find_orders_for_user")
+def find_orders_for_user(payload: ArgsWrapper):
+    """Orders for ``user_id`` or ``email`` (optionally one ``status``), plus
+    the user's ``last_order_id`` resolved to an order."""
+    err = _require_strings(payload.args, "user_id", "email", "status")
+    if err:
+        return err
+    snap = SNAPSHOT  # one snapshot for the whole call, even across a reload
+    user_id = payload.args.get("user_id")
+    email = payload.args.get("email")
+    if not user_id and not email:
+        return tool_err("Provide user_id or email", 400)
+    user = snap.catalog.user(user_id=user_id, email=email)
+    if user is None and not user_id:
+        return tool_err(f"No user with email {email}", 404)
+    user_id = user_id or user["user_id"]
+
+    where = {"user_id": user_id}
+    status = payload.args.get("status")
+    if status:
+        where["status"] = status
+    orders, more = snap.orders.find(_limit(payload.args.get("limit")), **where)
+    last = snap.orders.get(user.get("last_order_id")) if user else None
+    if user is None and not orders:
+        return tool_err(f"No {status + ' ' if status else ''}orders found for user {user_id}", 404)
+    return tool_ok(
+        {
+            "user_id": user_id,
+            "first_name": user.get("first_name") if user else None,
+            "orders": [_order_summary(o) for o in orders],
+            "has_more": more,
+            "last_order": _order_summary(last) if last else None,
+        }
+    )
+
+
+@tool("/check_product_availability")
+def check_product_availability(payload: ArgsWrapper):
+    """Stock for ``product_id`` or ``product_name``, optionally at one
+    ``vendor``; or, given only ``vendor``, that vendor's products
+    (filtered by ``availability_status`` if given)."""
+    err = _require_strings(payload.args, "product_id", "product_name", "vendor", "availability_status")
+    if err:
+        return err
+    catalog = SNAPSHOT.catalog
+    product_id = payload.args.get("product_id")
+    name = payload.args.get("product_name")
+    vendor = payload.args.get("vendor")
+    availability = payload.args.get("availability_status")
+    if not (product_id or name or vendor):
+        return tool_err("Provide product_id, product_name or vendor", 400)
+
+    limit = _limit(payload.args.get("limit"), default=10)
+    products, more = catalog.products(limit, product_id, name, vendor, availability)
+    if not products:
+        wanted = product_id or name
+        if wanted and vendor:
+            elsewhere, _ = catalog.products(limit, product_id, name)
+            if elsewhere:
+                sellers = ", ".join(sorted({p["vendor"] for p in elsewhere}))
+                return tool_err(f"{wanted} is not available at {vendor}; sold by {sellers}", 404)
+        return tool_err(f"Product {wanted or 'matching ' + vendor} not found", 404)
+    rows = [
+        {
+            "product_id": p["product_id"],
+            "product_name": p["product_name"],
+            "vendor": p["vendor"],
+            "availability_status": p["availability_status"],
+            "available_quantity": p["available_quantity"],
+            "price": p["price"],
+        }
+        for p in products
+    ]
+    in_stock = any(p["available_quantity"] > 0 and p["availability_status"] != "out_of_stock" for p in products)
+    return tool_ok({"products": rows, "has_more": more, "in_stock": in_stock})
+
+
 # ----------- NEW: explicit end‑call hook ---------------------------------- #
 
-@app.post("/end_call")
+@tool("/end_call")
 def end_call(_: ArgsWrapper):
     """Signal Retell to terminate the call cleanly."""
     return tool_ok({"hang_up": True})
 
 
+# ----------- Batch: several tool calls in one round trip ------------------ #
+BATCH_MAX_CALLS = int(os.getenv("BATCH_MAX_CALLS", "50"))
+
+
+@app.post("/batch")
+async def batch(payload: ArgsWrapper):
+    """Run ``args.calls = [{"tool": …, "args": {…}}, …]`` and return one
+    envelope per call, in request order.
+
+    Calls naming the same ``order_id`` run one after another in the order
+    given (so "cancel then check status" sees the cancellation); everything
+    else runs concurrently, which also lets independent mutations share a
+    journal fsync.
+    """
+    calls = payload.args.get("calls")
+    if not isinstance(calls, list) or not calls:
+        return tool_err("args.calls must be a non-empty list of {tool, args}", 400)
+    if len(calls) > BATCH_MAX_CALLS:
+        return tool_err(f"At most {BATCH_MAX_CALLS} calls per batch", 400)
+
+    results: List[Optional[Dict[str, Any]]] = [None] * len(calls)
+    chains: Dict[str, List[int]] = {}
+    for i, call in enumerate(calls):
+        args = call.get("args") if isinstance(call, dict) else None
+        order_id = args.get("order_id") if isinstance(args, dict) else None
+        key = f"order:{order_id}" if isinstance(order_id, str) else f"call:{i}"
+        chains.setdefault(key, []).append(i)
+
+    async def run_chain(indexes: List[int]) -> None:
+        for i in indexes:
+            call = calls[i] if isinstance(calls[i], dict) else {"tool": calls[i]}
+            name = call.get("tool")
+            fn = TOOLS.get(name) if isinstance(name, str) else None
+            args = call.get("args", {})
+            if not isinstance(name, str):
+                results[i] = tool_err("tool must be a string", 400)
+            elif fn is None:
+                results[i] = tool_err(f"Unknown tool {name!r}", 404)
+            elif not isinstance(args, dict):
+                results[i] = tool_err("args must be an object", 400)
+            else:
+                try:
+                    results[i] = await run_tool(fn, ArgsWrapper(args=args))
+                except Exception as exc:  # one bad call must not sink the rest
+                    results[i] = tool_err(f"{type(exc).__name__}: {exc}", 500)
+
+    await asyncio.gather(*(run_chain(indexes) for indexes in chains.values()))
+    return tool_ok({"results": results})
+
+
 # --------------------------------------------------------------------------- #
 # ••• MISC •••
 # --------------------------------------------------------------------------- #
 @app.get("/health")
 def health():
-    return {"status": "ok", "dataset_rows": len(ORDERS)}
+    body = {"status": "ok", "dataset_rows": len(ORDERS), "store": ORDERS.mode}
+    if JOURNAL is not None:
+        body["persistence"] = JOURNAL.report()
+    if SINK is not None:
+        body["sink"] = SINK.report()
+    body["snapshot"] = {**SNAPSHOT.report(), **_RELOAD_STATUS}
+    if RESPONSE_CACHE is not None:
+        body["response_cache"] = RESPONSE_CACHE.report()
+    return body
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus text exposition: per-endpoint latency, in-flight requests,
+    thread-pool saturation and event-loop lag."""
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    out = [
+        "# HELP volt_request_seconds HTTP request latency by route and status.",
+        "# TYPE volt_request_seconds histogram",
+    ]
+    for (path, status), hist in sorted(REQUEST_LATENCY.items()):
+        out += hist.render("volt_request_seconds", f'path="{path}",status="{status}"')
+    out += ["# HELP volt_requests_in_flight Requests currently being handled.", "# TYPE volt_requests_in_flight gauge"]
+    out += [f'volt_requests_in_flight{{path="{p}"}} {n}' for p, n in sorted(IN_FLIGHT.items())]
+    out += [
+        "# HELP volt_threadpool_busy Worker threads in use (sync handlers, sqlite calls).",
+        "# TYPE volt_threadpool_busy gauge",
+        f"volt_threadpool_busy {limiter.borrowed_tokens}",
+        "# HELP volt_threadpool_size Thread-pool capacity; busy == size means requests queue.",
+        "# TYPE volt_threadpool_size gauge",
+        f"volt_threadpool_size {limiter.total_tokens}",
+        "# HELP volt_threadpool_waiting Calls waiting for a free worker thread.",
+        "# TYPE volt_threadpool_waiting gauge",
+        f"volt_threadpool_waiting {limiter.statistics().tasks_waiting}",
+        "# HELP volt_event_loop_lag_seconds How late a 100 ms timer fires.",
+        "# TYPE volt_event_loop_lag_seconds histogram",
+        *LOOP_LAG.render("volt_event_loop_lag_seconds"),
+        "# HELP volt_dataset_rows Orders in the active snapshot.",
+        "# TYPE volt_dataset_rows gauge",
+        f"volt_dataset_rows {len(ORDERS)}",
+        "# HELP volt_snapshot_version Active dataset snapshot version.",
+        "# TYPE volt_snapshot_version gauge",
+        f"volt_snapshot_version {SNAPSHOT.version}",
+    ]
+    if RESPONSE_CACHE is not None:
+        out += ["# TYPE volt_response_cache_total counter"]
+        out += [f'volt_response_cache_total{{result="{k}"}} {RESPONSE_CACHE.stats[k]}' for k in ("hits", "misses")]
+    if SINK is not None:
+        out += ["# TYPE volt_sink_records_total counter"]
+        out += [f'volt_sink_records_total{{result="{k}"}} {SINK.stats[k]}' for k in ("written", "dropped", "sampled_out")]
+    return "\n".join(out) + "\n"
+
+
+async def admin_reload(payload: ArgsWrapper):
+    """``{"args": {"data_file": "/path.json"?, "carry_mutations": bool?}}``;
+    registered only with ADMIN_RELOAD=1."""
+    if _RELOAD_LOCK.locked():
+        return tool_err("A reload is already in progress", 409)
+    data_file = payload.args.get("data_file")
+    carry = payload.args.get("carry_mutations", RELOAD_CARRY_MUTATIONS)
+    if data_file is not None and not isinstance(data_file, str):
+        return tool_err("data_file must be a string", 400)
+    if not isinstance(carry, bool):
+        return tool_err("carry_mutations must be true or false", 400)
+    path = pathlib.Path(data_file).resolve() if data_file else None
+    # sqlite mode writes <file>.sqlite, .lock and .staging next to the
+    # source, so only directories that already hold ours are allowed.
+    roots = [DATA_FILE.parent] + ([pathlib.Path(STORE_PATH).resolve().parent] if STORE_PATH else [])
+    if path is not None and not any(path.is_relative_to(root) for root in roots):
+        return tool_err(f"data_file must be inside {' or '.join(map(str, roots))}", 400)
+    try:
+        snap = await run_in_threadpool(reload_dataset, path, carry)
+    except Exception as exc:
+        return tool_err(f"Reload failed, still serving version {SNAPSHOT.version}: {exc}", 400)
+    return tool_ok(snap.report())
+
+
+if ADMIN_RELOAD:
+    app.post("/admin/reload")(admin_reload)
@@ -0,0 +1,90 @@
+"""
+Request latency, in-flight and event-loop lag instruments behind /metrics.
+"""
+
+import asyncio
+import bisect
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+LOOP_LAG_INTERVAL = 0.1
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str = "") -> List[str]:
+        sep, tail = (",", f"{{{labels}}}") if labels else ("", "")
+        lines, running = [], 0
+        for le, n in zip((*map(str, LATENCY_BUCKETS), "+Inf"), self.counts):
+            running += n
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {running}')
+        lines.append(f"{name}_sum{tail} {self.sum:.6f}")
+        lines.append(f"{name}_count{tail} {self.count}")
+        return lines
+
+
+# (route path, status) → latency; route path → requests in progress
+REQUEST_LATENCY: Dict[Tuple[str, int], Histogram] = {}
+IN_FLIGHT: Dict[str, int] = {}
+LOOP_LAG = Histogram()
+
+
+class MetricsMiddleware:
+    """Pure-ASGI timing of every HTTP request, labelled by route path.
+
+    Paths that match no route are folded into ``other`` so a scanner can't
+    blow up the label set.
+    """
+
+    def __init__(self, app: Any):
+        self.app = app
+        self._paths: Optional[set] = None
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        if self._paths is None:
+            self._paths = {getattr(r, "path", None) for r in scope["app"].routes}
+        path = scope["path"] if scope["path"] in self._paths else "other"
+        status = 500
+
+        async def send_wrapper(message: Dict[str, Any]) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        IN_FLIGHT[path] = IN_FLIGHT.get(path, 0) + 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            IN_FLIGHT[path] -= 1
+            hist = REQUEST_LATENCY.get((path, status))
+            if hist is None:
+                hist = REQUEST_LATENCY[(path, status)] = Histogram()
+            hist.observe(time.perf_counter() - started)
+
+
+async def measure_loop_lag() -> None:
+    """Sleep LOOP_LAG_INTERVAL and record how late we wake up: time the
+    loop spent on other work (or blocked) when it should have run us."""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        LOOP_LAG.observe(max(0.0, loop.time() - started - LOOP_LAG_INTERVAL))
@@ -0,0 +1,183 @@
+"""
+Buffered writer for call logs and tickets (SINK_DIR).
+"""
+
+import gzip
+import json
+import os
+import pathlib
+import queue
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+class RecordSink:
+    """Bounded queue + background writer for call logs and tickets.
+
+    Records are written in batches (*batch_size* records or every
+    *flush_seconds*, whichever comes first), each batch as one gzip member
+    appended to ``<kind>-<start>-<pid>-<n>.jsonl.gz``; a file is rotated once
+    it passes *rotate_bytes*.  Concatenated gzip members read back as one
+    stream (``zcat``, ``gzip.open``), and a crash loses at most the batch
+    being written.
+
+    When the queue is full the policy decides: ``block`` waits up to
+    *block_seconds* then drops, ``drop`` drops at once, ``sample`` keeps
+    only *sample_rate* of call logs while the queue is over half full
+    (tickets are never sampled out).  Tickets are also indexed by id in
+    ``tickets.sqlite``.
+    """
+
+    def __init__(
+        self,
+        directory: pathlib.Path,
+        policy: str = "block",
+        queue_size: int = 10_000,
+        block_seconds: float = 1.0,
+        sample_rate: float = 0.1,
+        batch_size: int = 1000,
+        flush_seconds: float = 1.0,
+        rotate_bytes: int = 64 * 1024 * 1024,
+    ):
+        if policy not in {"block", "drop", "sample"}:
+            raise RuntimeError(f"❌  Unknown SINK_POLICY {policy!r}; use block, drop or sample")
+        self.dir = directory
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.policy = policy
+        self.block_seconds = block_seconds
+        self.sample_rate = sample_rate
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.rotate_bytes = rotate_bytes
+        self.stats: Dict[str, Any] = {
+            "accepted": 0, "written": 0, "dropped": 0, "sampled_out": 0, "batches": 0, "files": 0,
+            "write_errors": 0, "last_error": None,
+        }
+        self._stats_lock = threading.Lock()  # submit() runs on many threads at once
+        self._queue: "queue.Queue[Optional[Tuple[str, Dict[str, Any]]]]" = queue.Queue(queue_size)
+        self._rng = random.Random()
+        self._stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        self._files: Dict[str, Tuple[pathlib.Path, int]] = {}
+        self._unflushed: Dict[str, Dict[str, Any]] = {}
+        # One connection, shared by the writer thread and get_ticket lookups.
+        self._index = sqlite3.connect(self.dir / "tickets.sqlite", timeout=30, check_same_thread=False)
+        self._index_lock = threading.Lock()
+        self._index.execute("PRAGMA journal_mode = WAL")
+        self._index.execute(
+            "CREATE TABLE IF NOT EXISTS tickets (ticket_id TEXT PRIMARY KEY, created_at TEXT, file TEXT, body TEXT)"
+        )
+        self._writer = threading.Thread(target=self._run, name="record-sink", daemon=True)
+        self._writer.start()
+
+    # .. producer side ......................................................
+
+    def submit(self, kind: str, record: Dict[str, Any]) -> bool:
+        """Queue *record*; False if backpressure dropped it."""
+        if kind != "ticket" and self.policy == "sample" and self._queue.qsize() * 2 >= self._queue.maxsize:
+            if self._rng.random() >= self.sample_rate:
+                self._count(sampled_out=1)
+                return False
+        if kind == "ticket":
+            self._unflushed[record["ticket_id"]] = record
+        try:
+            if self.policy == "block":
+                self._queue.put((kind, record), timeout=self.block_seconds)
+            else:
+                self._queue.put_nowait((kind, record))
+        except queue.Full:
+            self._unflushed.pop(record.get("ticket_id"), None)
+            self._count(dropped=1)
+            return False
+        self._count(accepted=1)
+        return True
+
+    def _count(self, last_error: Optional[str] = None, **deltas: int) -> None:
+        with self._stats_lock:
+            for key, n in deltas.items():
+                self.stats[key] += n
+            if last_error is not None:
+                self.stats["last_error"] = last_error
+
+    def ticket(self, ticket_id: str) -> Optional[Dict[str, Any]]:
+        pending = self._unflushed.get(ticket_id)
+        if pending is not None:
+            return pending
+        with self._index_lock:
+            row = self._index.execute("SELECT body FROM tickets WHERE ticket_id = ?", (ticket_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    # .. writer side ........................................................
+
+    def _run(self) -> None:
+        closing = False
+        while not closing:
+            batch: List[Tuple[str, Dict[str, Any]]] = []
+            deadline = time.monotonic() + self.flush_seconds
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+            if batch:
+                self._flush(batch)
+
+    def _flush(self, batch: List[Tuple[str, Dict[str, Any]]]) -> None:
+        by_kind: Dict[str, List[Dict[str, Any]]] = {}
+        for kind, record in batch:
+            by_kind.setdefault(kind, []).append(record)
+        for kind, records in by_kind.items():
+            try:
+                self._write(kind, records)
+            except Exception as exc:
+                # Full disk, bad permissions …: lose this batch, not the writer.
+                self._files.pop(kind, None)  # the file may end in a torn member
+                if kind == "ticket":
+                    for r in records:
+                        self._unflushed.pop(r["ticket_id"], None)
+                self._count(write_errors=1, dropped=len(records), last_error=f"{type(exc).__name__}: {exc}")
+                continue
+            self._count(written=len(records))
+        self._count(batches=1)
+
+    def _write(self, kind: str, records: List[Dict[str, Any]]) -> None:
+        path = self._target(kind)
+        payload = "".join(json.dumps(r, separators=(",", ":"), default=str) + "\n" for r in records)
+        with path.open("ab") as f:
+            f.write(gzip.compress(payload.encode("utf-8"), compresslevel=6))
+        self._files[kind] = (path, self._files[kind][1] + len(payload))
+        if kind == "ticket":
+            rows = [
+                (r["ticket_id"], r["created_at"], path.name, json.dumps(r, separators=(",", ":"), default=str))
+                for r in records
+            ]
+            with self._index_lock, self._index:
+                self._index.executemany("INSERT OR REPLACE INTO tickets VALUES (?, ?, ?, ?)", rows)
+            for r in records:
+                self._unflushed.pop(r["ticket_id"], None)
+
+    def _target(self, kind: str) -> pathlib.Path:
+        path, size = self._files.get(kind, (None, 0))
+        if path is None or size >= self.rotate_bytes:
+            n = self.stats["files"]
+            path = self.dir / f"{kind}-{self._stamp}-{os.getpid()}-{n:04d}.jsonl.gz"
+            self._files[kind] = (path, 0)
+            self._count(files=1)
+        return path
+
+    def close(self) -> None:
+        """Write out everything still queued and stop the writer."""
+        self._queue.put(None)
+        self._writer.join()
+        self._index.close()
+
+    def report(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        return {**stats, "queued": self._queue.qsize(), "policy": self.policy}
@@ -0,0 +1,779 @@
+"""
+Order stores and user/product catalogs behind main.py's ``ORDERS`` / ``CATALOG``.
+
+memory  – json.load + plain dicts (original behaviour, fine for small files)
+compact – streamed load into slotted records, roughly half the RAM of dicts
+sqlite  – indexed on-disk copy built once next to DATA_FILE, boots in ms
+"""
+
+import fcntl
+import json
+import pathlib
+import sqlite3
+import sys
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+ORDER_FIELDS = (
+    "order_id",
+    "user_id",
+    "status",
+    "vendor_name",
+    "order_type",
+    "delivery_eta",
+    "delivered_at",
+    "items",
+    "issues",
+    "can_cancel",
+    "eligible_for_refund",
+)
+# Fields with a secondary index on every store (find_orders filters).
+ORDER_INDEXES = ("user_id", "status", "vendor_name")
+
+
+_DELIMITERS = frozenset(" \t\r\n,:]}")
+
+
+def iter_dataset(path: pathlib.Path, chunk_size: int = 1 << 20) -> Iterator[Tuple[str, bool, Any]]:
+    """Stream the top-level object of *path* without loading it whole.
+
+    Yields ``(key, is_item, value)``: one tuple per element for array
+    sections (``is_item=True``) and one per scalar/object section.
+    """
+    decoder = json.JSONDecoder()
+    with path.open(encoding="utf-8") as fh:
+        buf, pos, eof = "", 0, False
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof
+            chunk = fh.read(chunk_size)
+            if not chunk:
+                eof = True
+                return False
+            buf, pos = buf[pos:] + chunk, 0
+            return True
+
+        def peek() -> str:
+            nonlocal pos
+            while True:
+                while pos < len(buf) and buf[pos] in " \t\r\n":
+                    pos += 1
+                if pos < len(buf) or not fill():
+                    return buf[pos] if pos < len(buf) else ""
+
+        def expect(ch: str) -> None:
+            nonlocal pos
+            if peek() != ch:
+                raise ValueError(f"{path}: expected {ch!r} at offset {fh.tell()}")
+            pos += 1
+
+        def value() -> Any:
+            nonlocal pos
+            peek()
+            while True:
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                    # A scalar cut by the buffer edge still decodes ("12." → 12,
+                    # "1.5e" → 1.5); it is only complete once a delimiter follows.
+                    if eof or (end < len(buf) and buf[end] in _DELIMITERS):
+                        pos = end
+                        return obj
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                fill()
+
+        expect("{")
+        if peek() == "}":
+            return
+        while True:
+            key = value()
+            expect(":")
+            if peek() == "[":
+                pos += 1
+                if peek() == "]":
+                    pos += 1
+                else:
+                    while True:
+                        yield key, True, value()
+                        if peek() == ",":
+                            pos += 1
+                            continue
+                        expect("]")
+                        break
+            else:
+                yield key, False, value()
+            if peek() == ",":
+                pos += 1
+                continue
+            expect("}")
+            return
+
+
+class OrderStore(ABC):
+    """Everything the tool endpoints need from ``ORDERS``.
+
+    ``get`` returns a mapping-like record (``order["status"]``); writes go
+    through ``update`` so that stores not backed by live dicts see them.
+    """
+
+    mode = "abstract"
+    blocking = False  # True if calls may wait on disk or other processes
+    durable = False  # True if the store itself keeps its mutations (and carries them across reloads)
+
+    @abstractmethod
+    def get(self, order_id: Optional[str]) -> Optional[Mapping[str, Any]]:
+        """The order, or None if *order_id* is unknown."""
+
+    @abstractmethod
+    def update(self, order_id: str, changes: Dict[str, Any]) -> None:
+        """Apply *changes* unconditionally (recovery and reload replay)."""
+
+    @abstractmethod
+    def transition(
+        self, order_id: Optional[str], allowed: Callable[[Mapping[str, Any]], bool], changes: Dict[str, Any]
+    ) -> Tuple[Optional[Mapping[str, Any]], bool]:
+        """Compare-and-set: apply *changes* only if ``allowed(order)`` holds.
+
+        The check and the write are atomic with respect to every other
+        writer of the store (threads, coroutines and, for SQLite, other
+        worker processes).  Returns ``(order, applied)``; ``order`` is None
+        when the id is unknown.
+        """
+
+    @abstractmethod
+    def find(self, limit: int, **where: str) -> Tuple[List[Mapping[str, Any]], bool]:
+        """Up to *limit* orders matching every ``field=value`` in *where*
+        (fields from ORDER_INDEXES), plus whether more exist."""
+
+    def changed_orders(self) -> Optional[List[str]]:
+        """Ids of orders someone other than this process changed since the
+        last call, or None if there is no telling which (see ResponseCache)."""
+        return []
+
+    def catalog(self, data: Dict[str, Any]) -> "Catalog":
+        """Users/products lookups that belong with this store."""
+        return MemoryCatalog(data.get("users", []), data.get("products", []))
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of orders."""
+
+    def __contains__(self, order_id: object) -> bool:
+        return self.get(order_id) is not None  # type: ignore[arg-type]
+
+
+class MemoryOrderStore(OrderStore):
+    mode = "memory"
+
+    def __init__(self, orders: Iterator[Dict[str, Any]]):
+        self._orders: Dict[str, Any] = {}
+        # field → value → order ids; sets so that a status change is O(1)
+        self._index: Dict[str, Dict[Any, set]] = {f: {} for f in ORDER_INDEXES}
+        self._lock = threading.Lock()
+        for o in orders:
+            self._add(self._wrap(o))
+
+    def _wrap(self, order: Dict[str, Any]) -> Any:
+        return order
+
+    def _add(self, order: Any) -> None:
+        order_id = order["order_id"]
+        self._orders[order_id] = order
+        for field, index in self._index.items():
+            index.setdefault(order[field], set()).add(order_id)
+
+    def _apply(self, order: Any, changes: Dict[str, Any]) -> None:
+        for field in ORDER_INDEXES:
+            if field in changes and changes[field] != order[field]:
+                index = self._index[field]
+                index[order[field]].discard(order["order_id"])
+                index.setdefault(changes[field], set()).add(order["order_id"])
+        order.update(changes)
+
+    def get(self, order_id):
+        return self._orders.get(order_id)
+
+    def update(self, order_id, changes):
+        with self._lock:
+            self._apply(self._orders[order_id], changes)
+
+    def transition(self, order_id, allowed, changes):
+        with self._lock:
+            order = self._orders.get(order_id)
+            if order is None or not allowed(order):
+                return order, False
+            self._apply(order, changes)
+            return order, True
+
+    def find(self, limit, **where):
+        if not where or not set(where) <= set(ORDER_INDEXES):
+            raise ValueError(f"find() filters must be among {ORDER_INDEXES}")
+        with self._lock:
+            # Walk the smallest matching set and check the other filters.
+            candidates = min((self._index[f].get(v, ()) for f, v in where.items()), key=len)
+            found = []
+            for order_id in candidates:
+                order = self._orders[order_id]
+                if all(order[f] == v for f, v in where.items()):
+                    found.append(order)
+                    if len(found) > limit:
+                        break
+        return found[:limit], len(found) > limit
+
+    def __len__(self):
+        return len(self._orders)
+
+
+class OrderRecord:
+    """Slotted order: no per-instance ``__dict__``, interned enum strings and
+    ``(product_name, qty)`` tuples instead of one dict per line item."""
+
+    __slots__ = ORDER_FIELDS + ("extra",)
+
+    def __init__(self, data: Dict[str, Any]):
+        data = dict(data)
+        for name in ("order_id", "user_id", "status", "vendor_name", "order_type"):
+            v = data.pop(name, None)
+            setattr(self, name, sys.intern(v) if isinstance(v, str) else v)
+        self.delivery_eta = data.pop("delivery_eta", None)
+        self.delivered_at = data.pop("delivered_at", None)
+        self.items = tuple((i["product_name"], i["qty"]) for i in data.pop("items", ()))
+        self.issues = tuple(sys.intern(i) for i in data.pop("issues", ()))
+        self.can_cancel = bool(data.pop("can_cancel", False))
+        self.eligible_for_refund = bool(data.pop("eligible_for_refund", False))
+        self.extra = data or None
+
+    def __getitem__(self, key: str) -> Any:
+        if key == "items":
+            return [{"product_name": n, "qty": q} for n, q in self.items]
+        if key == "issues":
+            return list(self.issues)
+        if key in ORDER_FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def update(self, changes: Dict[str, Any]) -> None:
+        for key, v in changes.items():
+            if key not in ORDER_FIELDS:
+                self.extra = {**(self.extra or {}), key: v}
+            elif key == "items":
+                self.items = tuple((i["product_name"], i["qty"]) for i in v)
+            elif key == "issues":
+                self.issues = tuple(v)
+            else:
+                setattr(self, key, sys.intern(v) if isinstance(v, str) else v)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {**{k: self[k] for k in ORDER_FIELDS}, **(self.extra or {})}
+
+
+class CompactOrderStore(MemoryOrderStore):
+    mode = "compact"
+
+    def _wrap(self, order):
+        return OrderRecord(order)
+
+
+class SqliteOrderStore(OrderStore):
+    """Orders in an indexed SQLite file, read on demand.
+
+    The file is built once from *source* and reused for as long as the
+    source's size/mtime fingerprint matches, so a restart only opens it.
+    Every write also merges its changes into the ``mutations`` table, which
+    a rebuild with *carry_from* re-applies on top of the new data.  Rebuilds
+    happen in place (see _install), so every worker sharing the file moves
+    to the new data together.
+
+    Writes and rebuilds are also logged to ``changes``, tagged with the
+    process that made them, so each worker can tell which orders the others
+    touched (changed_orders) and drop just those from its response cache.
+    """
+
+    mode = "sqlite"
+    blocking = True
+    durable = True
+    SCHEMA_VERSION = 4
+    CHANGES_KEPT = 100_000  # rows of ``changes`` kept; a worker further behind clears its cache
+    _JSON = ("items", "issues")
+    _BOOL = ("can_cancel", "eligible_for_refund")
+    _COLUMNS = ORDER_FIELDS + ("extra",)
+
+    def __init__(
+        self, source: pathlib.Path, path: pathlib.Path, rebuild: bool = False, carry_from: Optional[pathlib.Path] = None
+    ):
+        self.source = source
+        self.path = path
+        self._local = threading.local()
+        self._writer = uuid.uuid4().hex
+        self._changes_lock = threading.Lock()
+        self._writes = 0
+        self._select = f"SELECT {', '.join(self._COLUMNS)} FROM orders WHERE order_id = ?"
+        self._update = f"UPDATE orders SET {', '.join(f'{c} = ?' for c in self._COLUMNS[1:])} WHERE order_id = ?"
+        built = self._ensure_built(rebuild, carry_from)
+        if carry_from is not None and carry_from != path and not built:
+            # Reusing a file built for another snapshot: bring ours over.
+            self._absorb(self._read_mutations(carry_from))
+        self._seen = self._conn().execute("SELECT COALESCE(MAX(seq), 0) FROM changes").fetchone()[0]
+        meta = dict(self._conn().execute("SELECT key, value FROM meta"))
+        meta.pop("__orders__")
+        meta.pop("__source__")
+        self.meta: Dict[str, Any] = {k: json.loads(v) for k, v in meta.items()}
+
+    # .. build ..............................................................
+
+    def _fingerprint(self) -> str:
+        st = self.source.stat()
+        return f"v{self.SCHEMA_VERSION}:{st.st_size}:{st.st_mtime_ns}"
+
+    def _is_current(self) -> bool:
+        if not self.path.exists():
+            return False
+        try:
+            with sqlite3.connect(self.path) as conn:
+                row = conn.execute("SELECT value FROM meta WHERE key = '__source__'").fetchone()
+        except sqlite3.DatabaseError:
+            return False
+        return bool(row) and row[0] == self._fingerprint()
+
+    def _ensure_built(self, rebuild: bool, carry_from: Optional[pathlib.Path]) -> bool:
+        """Build the file unless it is current; True if this call built it."""
+        if not rebuild and self._is_current():
+            return False
+        # Several workers may boot at once; only one of them builds.
+        with open(f"{self.path}.lock", "w") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            if rebuild or not self._is_current():
+                self._build(carry_from)
+                return True
+        return False
+
+    def _encode(self, order: Dict[str, Any]) -> Tuple[Any, ...]:
+        extra = {k: v for k, v in order.items() if k not in ORDER_FIELDS}
+        row = []
+        for name in ORDER_FIELDS:
+            v = order.get(name)
+            if name in self._JSON:
+                v = json.dumps(v or [], separators=(",", ":"))
+            elif name in self._BOOL:
+                v = int(bool(v))
+            row.append(v)
+        row.append(json.dumps(extra, separators=(",", ":")) if extra else None)
+        return tuple(row)
+
+    def _build(self, carry_from: Optional[pathlib.Path] = None) -> None:
+        # Parse into a staging file no worker ever opens, then install it
+        # into the live file in one transaction (see _install).
+        staging = self.path.with_name(self.path.name + ".staging")
+        staging.unlink(missing_ok=True)  # ours alone: we hold the build lock
+        try:
+            conn = sqlite3.connect(staging)
+            try:
+                self._populate(conn)
+            finally:
+                conn.close()
+            self._install(staging, carry_from)
+        finally:
+            staging.unlink(missing_ok=True)
+
+    # Rebuilt from the source each time; mutations outlive rebuilds (they
+    # are what carry_mutations keeps), and so does changes.
+    _TABLES = {
+        "meta": "(key TEXT PRIMARY KEY, value TEXT NOT NULL)",
+        "orders": """(
+            order_id TEXT PRIMARY KEY, user_id TEXT, status TEXT,
+            vendor_name TEXT, order_type TEXT, delivery_eta TEXT,
+            delivered_at TEXT, items TEXT, issues TEXT,
+            can_cancel INTEGER, eligible_for_refund INTEGER, extra TEXT
+        ) WITHOUT ROWID""",
+        "users": "(user_id TEXT PRIMARY KEY, email TEXT, body TEXT) WITHOUT ROWID",
+        "products": """(
+            product_id TEXT PRIMARY KEY, name TEXT, vendor TEXT,
+            availability_status TEXT, body TEXT
+        ) WITHOUT ROWID""",
+    }
+    # Built after the bulk copy: one sort per index instead of N inserts.
+    _INDEXES = (
+        "CREATE INDEX main.orders_user ON orders (user_id)",
+        "CREATE INDEX main.orders_status ON orders (status)",
+        "CREATE INDEX main.orders_vendor ON orders (vendor_name)",
+        "CREATE INDEX main.users_email ON users (email)",
+        "CREATE INDEX main.products_name ON products (name)",
+        "CREATE INDEX main.products_vendor ON products (vendor, availability_status)",
+        "ANALYZE main",
+    )
+
+    def _populate(self, conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        for table, columns in self._TABLES.items():
+            conn.execute(f"CREATE TABLE {table} {columns}")
+        inserts = {
+            "orders": f"INSERT OR REPLACE INTO orders VALUES ({', '.join('?' * len(self._COLUMNS))})",
+            "users": "INSERT OR REPLACE INTO users VALUES (?, ?, ?)",
+            "products": "INSERT OR REPLACE INTO products VALUES (?, ?, ?, ?, ?)",
+        }
+        encoders = {
+            "orders": self._encode,
+            "users": lambda u: (u["user_id"], (u.get("email") or "").lower(), json.dumps(u)),
+            "products": lambda p: (
+                p["product_id"],
+                (p.get("product_name") or "").lower(),
+                p.get("vendor"),
+                p.get("availability_status"),
+                json.dumps(p),
+            ),
+        }
+        batches: Dict[str, List[Tuple[Any, ...]]] = {k: [] for k in inserts}
+        count, sections = 0, {}
+        for key, is_item, value in iter_dataset(self.source):
+            if key in inserts and is_item:
+                batch = batches[key]
+                batch.append(encoders[key](value))
+                if key == "orders":
+                    count += 1
+                if len(batch) >= 10_000:
+                    conn.executemany(inserts[key], batch)
+                    batch.clear()
+            elif is_item:
+                sections.setdefault(key, []).append(value)
+            else:
+                sections[key] = value
+        for key, batch in batches.items():
+            conn.executemany(inserts[key], batch)
+        meta = [(k, json.dumps(v)) for k, v in sections.items()]
+        meta += [("__orders__", str(count)), ("__source__", self._fingerprint())]
+        conn.executemany("INSERT INTO meta VALUES (?, ?)", meta)
+        conn.commit()
+
+    def _install(self, staging: pathlib.Path, carry_from: Optional[pathlib.Path]) -> None:
+        """Replace the live file's contents with *staging*'s in one
+        ``BEGIN IMMEDIATE`` transaction.
+
+        The file itself is never swapped or deleted: other workers keep
+        their connections and see either the old dataset or the new one,
+        and a write they commit meanwhile lands before the copy (and is
+        carried over with the rest of ``mutations``) or after it.
+        """
+        conn = sqlite3.connect(self.path, timeout=30)
+        try:
+            try:
+                conn.execute("PRAGMA journal_mode = WAL")
+            except sqlite3.DatabaseError as exc:
+                raise RuntimeError(f"❌  {self.path} is not a usable SQLite file ({exc}); move it away") from exc
+            # Read before the transaction: another file, another lock.
+            carried = self._read_mutations(carry_from) if carry_from not in (None, self.path) else []
+            conn.execute("ATTACH DATABASE ? AS staging", (str(staging),))
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Dropping a table drops its indexes too.
+                for table, columns in self._TABLES.items():
+                    conn.execute(f"DROP TABLE IF EXISTS main.{table}")
+                    conn.execute(f"CREATE TABLE main.{table} {columns}")
+                    conn.execute(f"INSERT INTO main.{table} SELECT * FROM staging.{table}")
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS main.mutations (order_id TEXT PRIMARY KEY, changes TEXT NOT NULL) "
+                    "WITHOUT ROWID"
+                )
+                if carry_from is None:
+                    conn.execute("DELETE FROM main.mutations")
+                elif carry_from == self.path:
+                    carried = [(o, json.loads(c)) for o, c in conn.execute("SELECT * FROM main.mutations")]
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS main.changes "
+                    "(seq INTEGER PRIMARY KEY AUTOINCREMENT, order_id TEXT, writer TEXT NOT NULL)"
+                )
+                # order_id NULL: every order may have changed.
+                conn.execute("INSERT INTO main.changes (order_id, writer) VALUES (NULL, ?)", (self._writer,))
+                self._carry(conn, carried)
+                for statement in self._INDEXES:
+                    conn.execute(statement)
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            conn.execute("DETACH DATABASE staging")
+            # The copy went through the WAL; fold it back into the file.
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+
+    # .. access .............................................................
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # The WAL file is shared by every worker process, and mmap lets
+            # them all read pages straight out of one OS page cache.
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA synchronous = NORMAL")
+            conn.execute("PRAGMA mmap_size = 1073741824")
+            self._local.conn = conn
+        return conn
+
+    def _decode(self, row: Tuple[Any, ...]) -> Dict[str, Any]:
+        order = dict(zip(ORDER_FIELDS, row))
+        for name in self._JSON:
+            order[name] = json.loads(order[name])
+        for name in self._BOOL:
+            order[name] = bool(order[name])
+        if row[-1]:
+            order.update(json.loads(row[-1]))
+        return order
+
+    def get(self, order_id):
+        if order_id is None:
+            return None
+        row = self._conn().execute(self._select, (order_id,)).fetchone()
+        return self._decode(row) if row else None
+
+    def _write(self, conn: sqlite3.Connection, order: Dict[str, Any]) -> None:
+        row = self._encode(order)
+        conn.execute(self._update, row[1:] + row[:1])
+
+    def _record(self, conn: sqlite3.Connection, order_id: str, changes: Dict[str, Any]) -> None:
+        row = conn.execute("SELECT changes FROM mutations WHERE order_id = ?", (order_id,)).fetchone()
+        merged = {**json.loads(row[0]), **changes} if row else changes
+        conn.execute(
+            "INSERT OR REPLACE INTO mutations VALUES (?, ?)", (order_id, json.dumps(merged, separators=(",", ":")))
+        )
+
+    def _carry(self, conn: sqlite3.Connection, mutations: List[Tuple[str, Dict[str, Any]]]) -> None:
+        for order_id, changes in mutations:
+            row = conn.execute(self._select, (order_id,)).fetchone()
+            if row is None:
+                continue
+            order = self._decode(row)
+            order.update(changes)
+            self._write(conn, order)
+            self._record(conn, order_id, changes)
+
+    def _absorb(self, mutations: List[Tuple[str, Dict[str, Any]]]) -> None:
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._carry(conn, mutations)
+            if mutations:
+                conn.execute("INSERT INTO changes (order_id, writer) VALUES (NULL, ?)", (self._writer,))
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+
+    @staticmethod
+    def _read_mutations(db: pathlib.Path) -> List[Tuple[str, Dict[str, Any]]]:
+        if not db.exists():
+            return []
+        conn = sqlite3.connect(db, timeout=30)
+        try:
+            rows = conn.execute("SELECT order_id, changes FROM mutations").fetchall()
+        except sqlite3.OperationalError:  # file from before mutations were tracked
+            rows = []
+        finally:
+            conn.close()
+        return [(order_id, json.loads(changes)) for order_id, changes in rows]
+
+    def update(self, order_id, changes):
+        self.transition(order_id, lambda _: True, changes)
+
+    def transition(self, order_id, allowed, changes):
+        if order_id is None:
+            return None, False
+        conn = self._conn()
+        # IMMEDIATE takes the database write lock up front, so no other
+        # worker can commit between our read and our write.
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(self._select, (order_id,)).fetchone()
+            order = self._decode(row) if row else None
+            if order is None or not allowed(order):
+                conn.rollback()
+                return order, False
+            order.update(changes)
+            self._write(conn, order)
+            self._record(conn, order_id, changes)
+            conn.execute("INSERT INTO changes (order_id, writer) VALUES (?, ?)", (order_id, self._writer))
+            self._writes += 1
+            if self._writes % 1024 == 0:
+                conn.execute(
+                    "DELETE FROM changes WHERE seq <= (SELECT MAX(seq) FROM changes) - ?", (self.CHANGES_KEPT,)
+                )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return order, True
+
+    def find(self, limit, **where):
+        if not where or not set(where) <= set(ORDER_INDEXES):
+            raise ValueError(f"find() filters must be among {ORDER_INDEXES}")
+        cols = ", ".join(self._COLUMNS)
+        cond = " AND ".join(f"{f} = ?" for f in where)
+        rows = self._conn().execute(
+            f"SELECT {cols} FROM orders WHERE {cond} LIMIT ?", (*where.values(), limit + 1)
+        ).fetchall()
+        return [self._decode(r) for r in rows[:limit]], len(rows) > limit
+
+    def changed_orders(self):
+        # One cursor per process, not per thread: a thread's first lookup
+        # has nothing to catch up on that the others have not seen.
+        with self._changes_lock:
+            rows = self._conn().execute(
+                "SELECT seq, order_id, writer FROM changes WHERE seq > ? ORDER BY seq", (self._seen,)
+            ).fetchall()
+            if not rows:
+                return []
+            # seq only has gaps where old rows were trimmed away.
+            trimmed = rows[0][0] != self._seen + 1
+            self._seen = rows[-1][0]
+        others = [order_id for _, order_id, writer in rows if writer != self._writer]
+        return None if trimmed or None in others else others
+
+    def catalog(self, data):
+        return SqliteCatalog(self)
+
+    def __len__(self):
+        # Read each time: another worker may have rebuilt the file since.
+        return int(self._conn().execute("SELECT value FROM meta WHERE key = '__orders__'").fetchone()[0])
+
+
+class Catalog(ABC):
+    """Indexed users and products (read-only; nothing mutates them)."""
+
+    @abstractmethod
+    def user(self, user_id: Optional[str] = None, email: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """The user with *user_id*, else the one with *email* (case-blind)."""
+
+    @abstractmethod
+    def products(
+        self,
+        limit: int,
+        product_id: Optional[str] = None,
+        name: Optional[str] = None,
+        vendor: Optional[str] = None,
+        availability: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """Products matching every given filter (``name`` is case-blind),
+        at most *limit*, plus whether more exist.  Needs an id, a name or a
+        vendor to start from."""
+
+
+class MemoryCatalog(Catalog):
+    def __init__(self, users: List[Dict[str, Any]], products: List[Dict[str, Any]]):
+        self._users = {u["user_id"]: u for u in users}
+        self._users_by_email = {u["email"].lower(): u for u in users if u.get("email")}
+        self._products = {p["product_id"]: p for p in products}
+        self._by_name: Dict[str, List[Dict[str, Any]]] = {}
+        self._by_vendor: Dict[Tuple[str, Optional[str]], List[Dict[str, Any]]] = {}
+        for p in products:
+            self._by_name.setdefault((p.get("product_name") or "").lower(), []).append(p)
+            self._by_vendor.setdefault((p.get("vendor"), None), []).append(p)
+            self._by_vendor.setdefault((p.get("vendor"), p.get("availability_status")), []).append(p)
+
+    def user(self, user_id=None, email=None):
+        if user_id:
+            return self._users.get(user_id)
+        return self._users_by_email.get(email.lower()) if email else None
+
+    def products(self, limit, product_id=None, name=None, vendor=None, availability=None):
+        if product_id:
+            candidates = [self._products[product_id]] if product_id in self._products else []
+        elif name:
+            candidates = self._by_name.get(name.lower(), [])
+        elif vendor:
+            candidates = self._by_vendor.get((vendor, availability), [])
+        else:
+            raise ValueError("products() needs product_id, name or vendor")
+        found = []
+        for p in candidates:
+            if (not name or (p.get("product_name") or "").lower() == name.lower()) and (
+                not vendor or p.get("vendor") == vendor
+            ) and (not availability or p.get("availability_status") == availability):
+                found.append(p)
+                if len(found) > limit:
+                    break
+        return found[:limit], len(found) > limit
+
+
+class SqliteCatalog(Catalog):
+    def __init__(self, store: SqliteOrderStore):
+        self._conn = store._conn
+
+    def user(self, user_id=None, email=None):
+        if user_id:
+            row = self._conn().execute("SELECT body FROM users WHERE user_id = ?", (user_id,)).fetchone()
+        elif email:
+            row = self._conn().execute("SELECT body FROM users WHERE email = ?", (email.lower(),)).fetchone()
+        else:
+            row = None
+        return json.loads(row[0]) if row else None
+
+    def products(self, limit, product_id=None, name=None, vendor=None, availability=None):
+        if not (product_id or name or vendor):
+            raise ValueError("products() needs product_id, name or vendor")
+        where = {"product_id": product_id, "name": name and name.lower(), "vendor": vendor,
+                 "availability_status": availability}
+        where = {k: v for k, v in where.items() if v}
+        cond = " AND ".join(f"{k} = ?" for k in where)
+        rows = self._conn().execute(
+            f"SELECT body FROM products WHERE {cond} LIMIT ?", (*where.values(), limit + 1)
+        ).fetchall()
+        return [json.loads(r[0]) for r in rows[:limit]], len(rows) > limit
+
+
+def sqlite_path(source: pathlib.Path, store_path: Optional[str] = None) -> pathlib.Path:
+    """Where sqlite mode keeps the store for *source*."""
+    return pathlib.Path(store_path) if store_path else source.with_name(source.name + ".sqlite")
+
+
+def load_dataset(
+    path: pathlib.Path,
+    mode: str,
+    fresh: bool = False,
+    carry_from: Optional[OrderStore] = None,
+    store_path: Optional[str] = None,
+) -> Tuple[Dict[str, Any], OrderStore]:
+    """Return ``(DATA, ORDERS)`` for *mode*.
+
+    Only ``memory`` keeps ``DATA["orders"]``; the other modes hold orders in
+    the store alone so the dataset is never resident twice.  *fresh* makes
+    sqlite rebuild its file (dropping mutations stored in it) even if the
+    source is unchanged; *carry_from* is the sqlite store being replaced,
+    whose mutations the new file takes over.  *store_path* overrides where
+    the sqlite file lives (default: next to *path*).
+    """
+    if mode == "memory":
+        with path.open(encoding="utf-8") as f:
+            data: Dict[str, Any] = json.load(f)
+        return data, MemoryOrderStore(data["orders"])
+
+    if mode == "compact":
+        data = {}
+
+        def orders() -> Iterator[Dict[str, Any]]:
+            for key, is_item, value in iter_dataset(path):
+                if key == "orders" and is_item:
+                    yield value
+                elif is_item:
+                    data.setdefault(key, []).append(value)
+                else:
+                    data[key] = value
+
+        return data, CompactOrderStore(orders())
+
+    if mode == "sqlite":
+        previous = carry_from.path if isinstance(carry_from, SqliteOrderStore) else None
+        store = SqliteOrderStore(path, sqlite_path(path, store_path), rebuild=fresh, carry_from=previous)
+        return store.meta, store
+
+    raise RuntimeError(f"❌  Unknown STORE_MODE {mode!r}; use memory, compact or sqlite")
@@ -0,0 +1,19 @@
+import pathlib
+import shutil
+import sys
+
+import pytest
+
+from helpers import APP_DIR
+
+# Modules that don't read env-vars at import (stores, journal, sink …) are
+# tested in-process; main.py always runs in a subprocess (see helpers.py).
+sys.path.insert(0, str(APP_DIR))
+
+
+@pytest.fixture
+def data_file(tmp_path: pathlib.Path) -> pathlib.Path:
+    """A private copy of the bundled dataset (sqlite builds next to it)."""
+    path = tmp_path / "dataset.json"
+    shutil.copy(APP_DIR / "retell_mock_full_dataset.json", path)
+    return path
@@ -0,0 +1,90 @@
+"""
+Run scenarios against app/main.py in fresh interpreters.
+
+main.py reads its configuration from env-vars at import time, so every
+scenario runs in its own process (one per simulated worker) against a
+private copy of the bundled dataset.
+"""
+
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import textwrap
+
+APP_DIR = pathlib.Path(__file__).resolve().parent.parent / "app"
+TIMEOUT = 60
+
+# main.py settings a developer's shell may have exported; scenarios set
+# the ones they need explicitly.
+_SETTINGS = {
+    "DATA_FILE", "STORE_MODE", "STORE_PATH", "STATE_DIR", "SNAPSHOT_EVERY", "SINK_DIR", "SINK_POLICY",
+    "EXEC_MODE", "RELOAD_WATCH", "ADMIN_RELOAD", "RELOAD_CARRY_MUTATIONS", "RESPONSE_CACHE_MB", "WEB_CONCURRENCY",
+}
+
+# Prepended to every script: picks orders by state from whatever store is active.
+PRELUDE = """
+import json, os, sys, time
+import main
+from main import ArgsWrapper
+
+def first_order(pred):
+    ids = [o["order_id"] for o in json.load(open(main.DATA_FILE))["orders"]]
+    return next(i for i in ids if pred(main.ORDERS.get(i)))
+
+def call(fn, **args):
+    return fn(ArgsWrapper(args=args))
+
+def wait_for(path):
+    while not os.path.exists(path):
+        time.sleep(0.01)
+
+def emit(value):
+    print(json.dumps(value), flush=True)
+
+_client = None
+
+def client():
+    global _client
+    if _client is None:
+        from fastapi.testclient import TestClient
+        # Entered, so requests share one event loop and its worker threads
+        # like a running server.
+        _client = TestClient(main.app).__enter__()
+    return _client
+
+def http(path, **args):
+    return client().post(path, json={"args": args}).json()
+
+def status(order_id):  # over HTTP, i.e. through the response cache
+    return http("/check_order_status", order_id=order_id)["data"]["status"]
+"""
+
+
+def worker_env(data_file: pathlib.Path, **extra: str) -> dict:
+    values = {k: v for k, v in os.environ.items() if k not in _SETTINGS}
+    values.update(DATA_FILE=str(data_file), PYTHONPATH=str(APP_DIR), **extra)
+    return values
+
+
+def start(script: str, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-c", PRELUDE + textwrap.dedent(script)],
+        env=env,
+        cwd=APP_DIR,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+
+
+def result(proc: subprocess.Popen):
+    """The last line the script emit()ted."""
+    out, err = proc.communicate(timeout=TIMEOUT)
+    assert proc.returncode == 0, err
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def run(script: str, env: dict):
+    return result(start(script, env))
@@ -0,0 +1,55 @@
+"""
+/batch: order of results, per-call errors, and where each call runs.
+"""
+
+import pytest
+
+from helpers import run, worker_env
+
+
+def test_results_follow_request_order_and_fail_per_call(data_file):
+    observed = run(
+        """
+        cancel = first_order(lambda o: o["can_cancel"])
+        refund = first_order(lambda o: o["eligible_for_refund"])
+        calls = [
+            {"tool": "cancel_order", "args": {"order_id": cancel}},
+            {"tool": "request_refund", "args": {"order_id": refund}},
+            {"tool": "check_order_status", "args": {"order_id": cancel}},
+            {"tool": "request_refund", "args": {"order_id": refund}},
+            {"tool": "no_such_tool"},
+            {"tool": ["unhashable"]},
+            {"tool": "end_call", "args": "not an object"},
+            "not a call",
+            {"tool": "end_call"},
+        ]
+        results = http("/batch", calls=calls)["data"]["results"]
+        emit({
+            "ok": [r["ok"] for r in results],
+            "status": results[2]["data"]["status"],
+            "codes": [r["error"]["code"] for r in results if not r["ok"]],
+            "empty": http("/batch", calls=[]),
+            "too_many": http("/batch", calls=[{"tool": "end_call"}] * (main.BATCH_MAX_CALLS + 1))["error"]["code"],
+        })
+        """,
+        worker_env(data_file),
+    )
+    # Same order_id: the status check sees the cancel; only one refund goes through.
+    assert observed["ok"] == [True, True, True, False, False, False, False, False, True]
+    assert observed["status"] == "cancelled"
+    assert observed["codes"] == [400, 404, 400, 400, 404]
+    assert observed["empty"]["error"]["code"] == 400 and observed["too_many"] == 400
+
+
+@pytest.mark.parametrize("exec_mode, pooled", [("threadpool", True), ("async", False)])
+def test_calls_run_where_their_endpoint_would(data_file, exec_mode, pooled):
+    observed = run(
+        """
+        import threading
+        main.TOOLS["probe"] = lambda payload: main.tool_ok({"thread": threading.current_thread().name})
+        results = http("/batch", calls=[{"tool": "probe"}] * 3)["data"]["results"]
+        emit([r["data"]["thread"] for r in results])
+        """,
+        worker_env(data_file, EXEC_MODE=exec_mode),
+    )
+    assert [name.startswith("AnyIO worker thread") for name in observed] == [pooled] * 3
@@ -0,0 +1,59 @@
+"""
+EXEC_MODE: threadpool and async answer alike; async awaits journal commits.
+"""
+
+import pytest
+
+from helpers import run, worker_env
+
+# The same tool calls, answered in both modes (ticket ids and clocks aside).
+CALLS = """
+ids = [o["order_id"] for o in json.load(open(main.DATA_FILE))["orders"]]
+answers = [http("/check_order_status", order_id=i) for i in ids]
+answers += [http("/cancel_order", order_id=i) for i in ids]
+answers += [http("/request_refund", order_id=i, reason="late") for i in ids]
+answers += [http("/check_order_status", order_id="nope"), http("/end_call")]
+answers += [http("/log_call", transcript="hi")]
+"""
+
+
+def test_modes_answer_alike(data_file):
+    def answers(mode: str):
+        return run(CALLS + "emit(answers)", worker_env(data_file, EXEC_MODE=mode))
+
+    assert answers("threadpool") == answers("async")
+
+
+@pytest.mark.parametrize("store", ["memory", "sqlite"])
+def test_async_endpoints_are_coroutines(data_file, store):
+    observed = run(
+        """
+        import asyncio
+        routes = {r.path: r.endpoint for r in main.app.routes if hasattr(r, "endpoint")}
+        emit({"cancel": asyncio.iscoroutinefunction(routes["/cancel_order"]),
+              "blocking_store": main.ORDERS.blocking})
+        """,
+        worker_env(data_file, EXEC_MODE="async", STORE_MODE=store),
+    )
+    assert observed == {"cancel": True, "blocking_store": store == "sqlite"}
+
+
+def test_async_ok_means_durable(data_file, tmp_path):
+    observed = run(
+        """
+        import asyncio, httpx
+
+        order_id = first_order(lambda o: o["eligible_for_refund"])
+
+        async def race():
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+                calls = [c.post("/request_refund", json={"args": {"order_id": order_id}}) for _ in range(50)]
+                return [r.json()["ok"] for r in await asyncio.gather(*calls)]
+
+        approved = asyncio.run(race())
+        emit({"approved": approved.count(True), "durable_seq": main.JOURNAL.durable_seq})
+        """,
+        worker_env(data_file, EXEC_MODE="async", STATE_DIR=str(tmp_path / "state")),
+    )
+    assert observed == {"approved": 1, "durable_seq": 1}
@@ -0,0 +1,92 @@
+"""
+journal.py: group commit, crash recovery and what a failed write returns.
+"""
+
+import threading
+
+import pytest
+
+from helpers import result, run, start, worker_env
+from journal import JournalError, MutationJournal
+from stores import MemoryOrderStore
+
+
+def test_concurrent_appends_share_fsyncs(tmp_path):
+    journal = MutationJournal(tmp_path)
+    journal.recover(MemoryOrderStore([]))
+    futures, lock = [], threading.Lock()
+
+    def writer(n: int) -> None:
+        for i in range(50):
+            fut = journal.append(f"order-{n}-{i}", {"status": "cancelled"})
+            with lock:
+                futures.append(fut)
+            fut.result()
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert sorted(f.result() for f in futures) == list(range(1, 401))
+    assert journal.stats["commits"] == 400 and journal.stats["fsyncs"] < 400
+    journal.close()
+
+    replayed = MutationJournal(tmp_path)
+    store = MemoryOrderStore([{"order_id": "order-3-7", "user_id": "u", "status": "pending", "vendor_name": "v"}])
+    replayed.recover(store)
+    assert store.get("order-3-7")["status"] == "cancelled" and len(replayed.overlay) == 400
+    replayed.close()
+
+
+def test_append_after_close_raises(tmp_path):
+    journal = MutationJournal(tmp_path)
+    journal.recover(MemoryOrderStore([]))
+    journal.close()
+    with pytest.raises(JournalError):
+        journal.append("order", {"status": "cancelled"})
+
+
+def test_journal_replays_after_hard_exit(data_file, tmp_path):
+    env = worker_env(data_file, STORE_MODE="memory", STATE_DIR=str(tmp_path / "state"))
+    crashed = start(
+        """
+        order_id = first_order(lambda o: o["can_cancel"])
+        assert call(main.cancel_order, order_id=order_id)["ok"]
+        emit(order_id)
+        os._exit(0)  # no lifespan shutdown: no final snapshot, no log close
+        """,
+        env,
+    )
+    order_id = result(crashed)
+
+    recovered = run(
+        f"""
+        emit({{"status": main.ORDERS.get({order_id!r})["status"],
+               "can_cancel": main.ORDERS.get({order_id!r})["can_cancel"],
+               "replayed": main.JOURNAL.stats["recovered_mutations"]}})
+        """,
+        env,
+    )
+    assert recovered == {"status": "cancelled", "can_cancel": False, "replayed": 1}
+
+
+@pytest.mark.parametrize("exec_mode", ["threadpool", "async"])
+def test_write_failure_answers_503_and_reverts(data_file, tmp_path, exec_mode):
+    observed = run(
+        """
+        def full_disk(text):
+            raise OSError(28, "No space left on device")
+
+        order_id = first_order(lambda o: o["can_cancel"])
+        main.JOURNAL._write_log = full_disk
+        direct = http("/cancel_order", order_id=order_id)
+        batched = http("/batch", calls=[{"tool": "cancel_order", "args": {"order_id": order_id}}])
+        emit({"direct": direct, "batched": batched["data"]["results"][0],
+              "status": status(order_id), "errors": main.JOURNAL.stats["write_errors"]})
+        """,
+        worker_env(data_file, STATE_DIR=str(tmp_path / "state"), EXEC_MODE=exec_mode),
+    )
+    failed = {"ok": False, "error": {"code": 503, "message": "Could not persist change"}}
+    assert observed["direct"] == failed and observed["batched"] == failed
+    assert observed["status"] != "cancelled" and observed["errors"] == 2
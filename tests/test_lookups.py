@@ -0,0 +1,68 @@
+"""
+find_orders_for_user and check_product_availability, in every store mode.
+"""
+
+import json
+
+import pytest
+
+import generate_dataset
+from helpers import run, worker_env
+
+CALLS = {
+    "by_user": {"tool": "find_orders_for_user", "args": {"user_id": "U103", "limit": 50}},
+    "by_email": {"tool": "find_orders_for_user", "args": {"email": "USER4@example.com", "status": "delivered"}},
+    "limited": {"tool": "find_orders_for_user", "args": {"user_id": "U103", "limit": 2}},
+    "no_email": {"tool": "find_orders_for_user", "args": {"email": "nobody@example.com"}},
+    "no_user": {"tool": "find_orders_for_user", "args": {}},
+    "bad_user": {"tool": "find_orders_for_user", "args": {"user_id": 103}},
+    "by_id": {"tool": "check_product_availability", "args": {"product_id": "AAAAAB"}},
+    "by_name": {"tool": "check_product_availability", "args": {"product_name": "product 3"}},
+    "by_vendor": {"tool": "check_product_availability", "args": {"vendor": "FreshMart", "limit": 50}},
+    "elsewhere": {"tool": "check_product_availability", "args": {"product_name": "Product 3", "vendor": "Nowhere"}},
+    "no_product": {"tool": "check_product_availability", "args": {}},
+    "bad_vendor": {"tool": "check_product_availability", "args": {"vendor": ["FreshMart"]}},
+}
+
+
+@pytest.fixture(scope="module")
+def dataset(tmp_path_factory):
+    path = tmp_path_factory.mktemp("lookups") / "orders.json"
+    generate_dataset.generate(path, n_orders=400, n_products=30, n_users=20, seed=3)
+    return path, json.loads(path.read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("mode", ["memory", "compact", "sqlite"])
+def test_lookups(dataset, mode):
+    path, data = dataset
+    got = run(
+        f"""
+        calls = {CALLS!r}
+        answers = http("/batch", calls=list(calls.values()))["data"]["results"]
+        emit(dict(zip(calls, answers)))
+        """,
+        worker_env(path, STORE_MODE=mode),
+    )
+    orders = {o["order_id"]: o for o in data["orders"]}
+    users = {u["user_id"]: u for u in data["users"]}
+
+    by_user = got["by_user"]["data"]
+    assert {o["order_id"] for o in by_user["orders"]} == {i for i, o in orders.items() if o["user_id"] == "U103"}
+    assert not by_user["has_more"] and by_user["first_name"] == users["U103"]["first_name"]
+    assert by_user["last_order"]["order_id"] == users["U103"]["last_order_id"]
+
+    by_email = got["by_email"]["data"]
+    assert by_email["user_id"] == "U103"  # user4@… is the fourth user, case-blind
+    assert all(o["status"] == "delivered" for o in by_email["orders"])
+
+    assert len(got["limited"]["data"]["orders"]) == 2 and got["limited"]["data"]["has_more"]
+    assert [got[k]["error"]["code"] for k in ("no_email", "no_user", "bad_user")] == [404, 400, 400]
+
+    product = next(p for p in data["products"] if p["product_id"] == "AAAAAB")
+    assert got["by_id"]["data"]["products"][0]["product_name"] == product["product_name"]
+    assert got["by_name"]["data"]["products"][0]["product_name"] == "Product 3"
+    freshmart = {p["product_id"] for p in data["products"] if p["vendor"] == "FreshMart"}
+    assert {p["product_id"] for p in got["by_vendor"]["data"]["products"]} == freshmart
+    seller = next(p["vendor"] for p in data["products"] if p["product_name"] == "Product 3")
+    assert got["elsewhere"]["error"] == {"code": 404, "message": f"Product 3 is not available at Nowhere; sold by {seller}"}
+    assert [got[k]["error"]["code"] for k in ("no_product", "bad_vendor")] == [400, 400]
@@ -0,0 +1,77 @@
+"""
+/metrics exposition and app/loadgen.py, against a real uvicorn server.
+"""
+
+import json
+
+from helpers import run, worker_env
+from metrics import LATENCY_BUCKETS, Histogram
+
+
+def test_histogram_renders_cumulative_buckets():
+    hist = Histogram()
+    for value in (0.0002, 0.003, 0.003, 10.0):
+        hist.observe(value)
+    lines = hist.render("lat", 'path="/x"')
+    buckets = dict(line.rsplit(" ", 1) for line in lines[: len(LATENCY_BUCKETS) + 1])
+    assert buckets['lat_bucket{path="/x",le="0.0005"}'] == "1"
+    assert buckets['lat_bucket{path="/x",le="0.005"}'] == "3"
+    assert buckets['lat_bucket{path="/x",le="5.0"}'] == "3"
+    assert buckets['lat_bucket{path="/x",le="+Inf"}'] == "4"
+    assert lines[-2:] == ['lat_sum{path="/x"} 10.006200', 'lat_count{path="/x"} 4']
+    assert Histogram().render("lag")[-1] == "lag_count 0"
+
+
+def test_loadgen_run_shows_up_in_metrics(data_file):
+    observed = run(
+        f"""
+        import contextlib, io, socket, threading, urllib.request
+        import uvicorn
+        import loadgen
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            port = s.getsockname()[1]
+        server = uvicorn.Server(uvicorn.Config(main.app, port=port, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.01)
+
+        out = io.StringIO()
+        with contextlib.redirect_stdout(out):
+            code = loadgen.main(["--port", str(port), "--calls", "4", "--duration", "1", "--seed", "7",
+                                 "--data-file", {str(data_file)!r}, "--json"])
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{{port}}/no-such-tool")
+        except urllib.error.HTTPError:
+            pass
+        text = urllib.request.urlopen(f"http://127.0.0.1:{{port}}/metrics").read().decode()
+        server.should_exit = True
+        emit({{"code": code, "summary": json.loads(out.getvalue()), "metrics": text}})
+        """,
+        worker_env(data_file, STORE_MODE="memory", EXEC_MODE="async"),
+    )
+    summary = observed["summary"]
+    assert observed["code"] == 0
+    assert summary["requests"] > 0
+    assert all(t["failures"] == 0 for t in summary["tools"].values())
+    assert set(summary["scenarios"]) <= {e["scenario"] for e in json.loads(data_file.read_text())["edge_cases"]}
+
+    samples = {}
+    for line in observed["metrics"].splitlines():
+        if line and not line.startswith("#"):
+            name, value = line.rsplit(" ", 1)
+            samples[name] = float(value)
+    served = sum(t["count"] for t in summary["tools"].values())
+    counted = sum(v for k, v in samples.items() if k.startswith("volt_request_seconds_count{") and "/metrics" not in k)
+    assert counted == served + 1  # plus the unknown path
+    assert samples['volt_request_seconds_count{path="other",status="404"}'] == 1
+    assert samples['volt_request_seconds_count{path="/get_current_datetime",status="200"}'] == (
+        summary["tools"]["get_current_datetime"]["count"]
+    )
+    assert samples["volt_dataset_rows"] == 10
+    assert samples["volt_threadpool_size"] > 0
+    assert samples["volt_event_loop_lag_seconds_count"] >= 1
+    assert samples['volt_response_cache_total{result="hits"}'] + samples[
+        'volt_response_cache_total{result="misses"}'
+    ] > 0
@@ -0,0 +1,131 @@
+"""
+Hot reload: carry-over, validation, the file watcher and shared SQLite files.
+"""
+
+import json
+
+import pytest
+
+from helpers import result, run, start, worker_env
+
+MODES = ["memory", "compact", "sqlite"]
+
+
+def reload(**args) -> str:
+    return f'http("/admin/reload", **{args!r})'
+
+
+def test_admin_route_needs_admin_reload(data_file):
+    script = f"emit([client().post('/admin/reload', json={{'args': {{}}}}).status_code, {reload()}.get('ok')])"
+    assert run(script, worker_env(data_file)) == [404, None]
+    assert run(script, worker_env(data_file, ADMIN_RELOAD="1")) == [200, True]
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_reload_with_and_without_carry(data_file, tmp_path, mode):
+    state = {"STATE_DIR": str(tmp_path / "state")} if mode != "sqlite" else {}
+    env = worker_env(data_file, STORE_MODE=mode, ADMIN_RELOAD="1", **state)
+    order_id = run("emit(first_order(lambda o: o['can_cancel']))", env)
+    observed = run(
+        f"""
+        before = status({order_id!r})
+        assert http("/cancel_order", order_id={order_id!r})["ok"]
+        carried = {reload(carry_mutations=True)}
+        after_carry = status({order_id!r})
+        fresh = {reload(carry_mutations=False)}
+        emit({{"before": before, "after_carry": after_carry, "after_fresh": status({order_id!r}),
+               "versions": [carried["data"]["version"], fresh["data"]["version"]]}})
+        """,
+        env,
+    )
+    assert observed["after_carry"] == "cancelled" and observed["after_fresh"] == observed["before"]
+    assert observed["versions"] == [2, 3]
+    # Nothing from before the fresh reload comes back after a restart.
+    assert run(f"emit(status({order_id!r}))", env) == observed["before"]
+
+
+def test_reload_validates_its_arguments(data_file, tmp_path):
+    other = tmp_path.parent / f"{tmp_path.name}-outside.json"
+    other.write_text(data_file.read_text(encoding="utf-8"), encoding="utf-8")
+    observed = run(
+        f"""
+        emit([{reload(carry_mutations="yes")}, {reload(data_file=5)}, {reload(data_file=str(other))},
+              {reload(data_file=str(data_file.with_name("missing.json")))},
+              main.SNAPSHOT.version])
+        """,
+        worker_env(data_file, ADMIN_RELOAD="1"),
+    )
+    *errors, version = observed
+    assert [e["error"]["code"] for e in errors] == [400, 400, 400, 400]
+    assert "still serving version 1" in errors[-1]["error"]["message"] and version == 1
+
+
+def test_reload_switches_to_another_file(data_file):
+    data = json.loads(data_file.read_text(encoding="utf-8"))
+    data["orders"][0]["status"] = "delivered"
+    data_file.with_name("other.json").write_text(json.dumps(data), encoding="utf-8")
+    observed = run(
+        f"""
+        reloaded = {reload(data_file=str(data_file.with_name("other.json")))}
+        emit([reloaded["data"]["data_file"], status({data["orders"][0]["order_id"]!r})])
+        """,
+        worker_env(data_file, ADMIN_RELOAD="1"),
+    )
+    assert observed == [str(data_file.with_name("other.json")), "delivered"]
+
+
+def test_watcher_reloads_a_changed_file(data_file):
+    data = json.loads(data_file.read_text(encoding="utf-8"))
+    order_id = data["orders"][0]["order_id"]
+    data["orders"][0]["status"] = "delivered"
+    observed = run(
+        f"""
+        before = status({order_id!r})
+        with open(main.DATA_FILE, "w") as f:
+            json.dump({data!r}, f)
+        deadline = time.monotonic() + 20
+        while main.SNAPSHOT.version == 1 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        emit([before, main.SNAPSHOT.version, status({order_id!r})])
+        """,
+        worker_env(data_file, RELOAD_WATCH="1", RELOAD_POLL_SECONDS="0.05"),
+    )
+    assert observed[1:] == [2, "delivered"] and observed[0] != "delivered"
+
+
+def test_sqlite_rebuild_reaches_every_worker(data_file, tmp_path):
+    env = worker_env(data_file, STORE_MODE="sqlite")
+    order_id = run("emit(first_order(lambda o: o['can_cancel']))", env)
+    rebuilt = tmp_path / "rebuilt"
+    # A worker that never reloads itself.
+    other = start(
+        f"""
+        assert call(main.cancel_order, order_id={order_id!r})["ok"]
+        emit("cancelled")
+        wait_for({str(rebuilt)!r})
+        emit([main.ORDERS.get({order_id!r})["status"], len(main.ORDERS)])
+        """,
+        env,
+    )
+    assert other.stdout.readline().strip() == '"cancelled"'
+    carried = run(
+        f"""
+        os.utime(main.DATA_FILE)  # a new fingerprint forces a rebuild
+        main.reload_dataset(carry_mutations=True)
+        emit(main.ORDERS.get({order_id!r})["status"])
+        """,
+        env,
+    )
+    assert carried == "cancelled"  # the other worker's write came along
+    fresh = run(
+        f"""
+        main.reload_dataset(carry_mutations=False)
+        emit(main.ORDERS.get({order_id!r})["status"])
+        """,
+        env,
+    )
+    rebuilt.touch()
+    assert fresh != "cancelled"
+    orders = len(json.loads(data_file.read_text(encoding="utf-8"))["orders"])
+    assert result(other) == [fresh, orders]  # same file, so it sees the rebuild too
+    assert not data_file.with_name("dataset.json.sqlite.staging").exists()
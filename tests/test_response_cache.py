@@ -0,0 +1,93 @@
+"""
+check_order_status responses served from RESPONSE_CACHE, and kept in step
+with writes by this worker and by other SQLite workers.
+"""
+
+import time
+
+import pytest
+
+from helpers import TIMEOUT, result, run, start, worker_env
+
+
+@pytest.mark.parametrize("mode", ["memory", "sqlite"])
+def test_cancel_invalidates_cached_status(data_file, mode):
+    observed = run(
+        """
+        order_id = first_order(lambda o: o["can_cancel"])
+        before = [status(order_id), status(order_id)]
+        hits = main.RESPONSE_CACHE.stats["hits"]
+        assert http("/cancel_order", order_id=order_id)["ok"]
+        emit({"before": before, "hits": hits, "after": status(order_id)})
+        """,
+        worker_env(data_file, STORE_MODE=mode),
+    )
+    assert observed["hits"] == 1  # the second lookup was served from the cache
+    assert observed["before"][0] == observed["before"][1] != "cancelled"
+    assert observed["after"] == "cancelled"
+
+
+def test_cancel_by_other_worker_invalidates_cached_status(data_file, tmp_path):
+    env = worker_env(data_file, STORE_MODE="sqlite")
+    order_id = run("emit(first_order(lambda o: o['can_cancel']))", env)
+    cached, cancelled = tmp_path / "cached", tmp_path / "cancelled"
+    reader = start(
+        f"""
+        before = [status({order_id!r}), status({order_id!r})]
+        open({str(cached)!r}, "w").close()
+        wait_for({str(cancelled)!r})
+        emit({{"before": before, "after": status({order_id!r})}})
+        """,
+        env,
+    )
+    deadline = time.monotonic() + TIMEOUT
+    while not cached.exists():
+        assert reader.poll() is None and time.monotonic() < deadline
+        time.sleep(0.01)
+    assert run(f"emit(call(main.cancel_order, order_id={order_id!r}))", env)["ok"]
+    cancelled.touch()
+
+    observed = result(reader)
+    assert observed["before"][0] != "cancelled"
+    assert observed["after"] == "cancelled"
+
+
+def test_sqlite_workers_keep_entries_other_workers_did_not_touch(data_file, tmp_path):
+    env = worker_env(data_file, STORE_MODE="sqlite")
+    cancel, keep = run(
+        "emit([o['order_id'] for o in json.load(open(main.DATA_FILE))['orders'] if o['can_cancel']][:2])", env
+    )
+    cached, cancelled = tmp_path / "cached", tmp_path / "cancelled"
+    reader = start(
+        f"""
+        import threading
+
+        lookup = main.cached_by_order(main.check_order_status)
+        def lookup_in_new_thread(order_id):
+            out = []
+            thread = threading.Thread(target=lambda: out.append(json.loads(call(lookup, order_id=order_id).body)))
+            thread.start()
+            thread.join()
+            return out[0]["data"]["status"]
+
+        # Each thread's first lookup used to look like another worker's write.
+        before = [lookup_in_new_thread(order_id) for order_id in ({keep!r}, {cancel!r}) * 3]
+        open({str(cached)!r}, "w").close()
+        wait_for({str(cancelled)!r})
+        after = {{order_id: lookup_in_new_thread(order_id) for order_id in ({keep!r}, {cancel!r})}}
+        emit({{"before": before, "after": after, "stats": main.RESPONSE_CACHE.report()}})
+        """,
+        env,
+    )
+    deadline = time.monotonic() + TIMEOUT
+    while not cached.exists():
+        assert reader.poll() is None and time.monotonic() < deadline
+        time.sleep(0.01)
+    assert run(f"emit(call(main.cancel_order, order_id={cancel!r}))", env)["ok"]
+    cancelled.touch()
+
+    observed = result(reader)
+    assert "cancelled" not in observed["before"]
+    assert observed["after"][cancel] == "cancelled"
+    stats = observed["stats"]
+    assert (stats["hits"], stats["misses"], stats["clears"]) == (5, 3, 0)  # keep: 4 hits; cancel: 1 hit, 2 misses
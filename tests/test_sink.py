@@ -0,0 +1,124 @@
+"""
+sink.py: batching, rotation, ticket lookups and backpressure.
+"""
+
+import gzip
+import json
+import threading
+import time
+
+from helpers import run, worker_env
+from sink import RecordSink
+
+
+def _read(sink: RecordSink, kind: str) -> list:
+    rows = []
+    for path in sorted(sink.dir.glob(f"{kind}-*.jsonl.gz")):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            rows += [json.loads(line) for line in f]
+    return rows
+
+
+def _stall(sink: RecordSink) -> threading.Event:
+    """Hold the writer inside its first write until the event is set."""
+    release, write = threading.Event(), sink._write
+
+    def stalled(kind, records):
+        release.wait()
+        write(kind, records)
+
+    sink._write = stalled
+    return release
+
+
+def test_batches_rotate_and_read_back_in_order(tmp_path):
+    sink = RecordSink(tmp_path, batch_size=10, flush_seconds=0.05, rotate_bytes=2000)
+    for n in range(300):
+        assert sink.submit("call", {"n": n, "pad": "x" * 20})
+    sink.close()
+    assert [r["n"] for r in _read(sink, "call")] == list(range(300))
+    assert sink.stats["files"] > 1 and sink.stats["written"] == 300 and sink.stats["batches"] >= 30
+
+
+def test_tickets_are_found_before_and_after_the_flush(tmp_path):
+    sink = RecordSink(tmp_path, flush_seconds=30)
+    ticket = {"ticket_id": "volt-1", "created_at": "2025-01-01T00:00:00+00:00", "details": {"a": 1}}
+    sink.submit("ticket", ticket)
+    assert sink.ticket("volt-1") == ticket  # still queued
+    sink.close()
+    reopened = RecordSink(tmp_path)
+    assert reopened.ticket("volt-1") == ticket and reopened.ticket("volt-2") is None
+    reopened.close()
+
+
+def test_full_queue_drops_and_samples_call_logs_only(tmp_path):
+    sink = RecordSink(tmp_path / "drop", policy="drop", queue_size=2, batch_size=1)
+    release = _stall(sink)
+    outcomes = [sink.submit("call", {"n": n}) for n in range(6)]
+    assert outcomes.count(False) >= 3 and sink.stats["dropped"] == outcomes.count(False)
+    release.set()
+    sink.close()
+
+    sink = RecordSink(tmp_path / "sample", policy="sample", queue_size=4, sample_rate=0.0, batch_size=1)
+    release = _stall(sink)
+    sink.submit("call", {"n": 0})
+    while sink._queue.qsize():  # until the stalled writer holds it
+        time.sleep(0.001)
+    assert sink.submit("call", {"n": 1}) and sink.submit("call", {"n": 2})  # now half full
+    assert not sink.submit("call", {"n": 3})
+    assert sink.submit("ticket", {"ticket_id": "volt-t", "created_at": "now"})
+    assert sink.stats["sampled_out"] == 1
+    release.set()
+    sink.close()
+
+
+def test_stats_add_up_under_concurrent_submits(tmp_path):
+    sink = RecordSink(tmp_path, policy="drop", queue_size=50)
+
+    def producer() -> None:
+        for n in range(2000):
+            sink.submit("call", {"n": n})
+
+    threads = [threading.Thread(target=producer) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    sink.close()
+    stats = sink.report()
+    assert stats["accepted"] + stats["dropped"] == 16000
+    assert stats["written"] == stats["accepted"] == len(_read(sink, "call"))
+
+
+def test_write_errors_lose_the_batch_not_the_writer(tmp_path):
+    sink = RecordSink(tmp_path, batch_size=1, flush_seconds=0.01)
+    write, failed = sink._write, []
+
+    def flaky(kind, records):
+        if not failed:
+            failed.append(records)
+            raise OSError(28, "No space left on device")
+        write(kind, records)
+
+    sink._write = flaky
+    for n in range(5):
+        sink.submit("call", {"n": n})
+    sink.close()
+    assert sink.stats["write_errors"] == 1 and sink.stats["written"] == 4
+    assert "No space left" in sink.stats["last_error"]
+
+
+def test_ticket_tools_over_http(data_file, tmp_path):
+    observed = run(
+        """
+        created = http("/create_ticket", issue="late delivery")
+        ticket_id = created["data"]["ticket_id"]
+        emit({"created": created, "found": http("/get_ticket", ticket_id=ticket_id),
+              "missing": http("/get_ticket", ticket_id="volt-none"), "bad": http("/get_ticket", ticket_id=5)})
+        """,
+        worker_env(data_file, SINK_DIR=str(tmp_path / "sink")),
+    )
+    created = observed["created"]["data"]
+    assert created["stored"] is True and created["details"] == {"issue": "late delivery"}
+    assert observed["found"]["data"] == {k: v for k, v in created.items() if k != "stored"}
+    assert observed["missing"]["error"]["code"] == 404 and observed["bad"]["error"]["code"] == 400
@@ -0,0 +1,125 @@
+"""
+stores.py: the streaming dataset reader and the three order stores.
+"""
+
+import json
+import pathlib
+
+import pytest
+
+import generate_dataset
+from stores import ORDER_INDEXES, Catalog, OrderStore, iter_dataset, load_dataset
+
+MODES = ["memory", "compact", "sqlite"]
+
+# Scalars of every shape, so that some chunk size cuts each one in two.
+EDGES = {
+    "int": 12345,
+    "float": -12.5e-3,
+    "exp": 1.5E+10,
+    "str": "a \"quoted\" \\ string with , : ] } inside",
+    "unicode": "Śródmieście ☕",
+    "flags": [True, False, None],
+    "numbers": [0, -1, 2.25, 1e3],
+    "nested": {"a": [1, {"b": "c"}], "d": {}},
+    "empty": [],
+    "last": 7,
+}
+
+
+def _rebuild(path: pathlib.Path, chunk_size: int) -> dict:
+    data: dict = {}
+    for key, is_item, value in iter_dataset(path, chunk_size=chunk_size):
+        if is_item:
+            data.setdefault(key, []).append(value)
+        else:
+            data[key] = value
+    return data
+
+
+@pytest.mark.parametrize("chunk_size", [*range(1, 17), 64, 1 << 20])
+def test_iter_dataset_matches_json_load(tmp_path, data_file, chunk_size):
+    edges = tmp_path / "edges.json"
+    edges.write_text(json.dumps(EDGES, indent=1, ensure_ascii=False), encoding="utf-8")
+    for path in (edges, data_file):
+        expected = json.loads(path.read_text(encoding="utf-8"))
+        expected = {k: v for k, v in expected.items() if v != []}  # nothing to yield for an empty array
+        assert _rebuild(path, chunk_size) == expected
+
+
+def test_iter_dataset_rejects_truncated_file(tmp_path):
+    path = tmp_path / "cut.json"
+    path.write_text(json.dumps(EDGES)[:-5], encoding="utf-8")
+    with pytest.raises(ValueError):
+        list(iter_dataset(path, chunk_size=7))
+
+
+@pytest.fixture(scope="module")
+def synthetic(tmp_path_factory) -> pathlib.Path:
+    path = tmp_path_factory.mktemp("synthetic") / "orders.json"
+    generate_dataset.generate(path, n_orders=2000, n_products=40, n_users=200, seed=7)
+    return path
+
+
+@pytest.fixture(params=MODES)
+def store(request, synthetic, tmp_path) -> OrderStore:
+    _, orders = load_dataset(synthetic, request.param, store_path=str(tmp_path / "orders.sqlite"))
+    return orders
+
+
+def test_stores_agree_with_the_source(store, synthetic):
+    source = json.loads(synthetic.read_text(encoding="utf-8"))["orders"]
+    assert len(store) == len(source)
+    for order in source[::97]:
+        got = store.get(order["order_id"])
+        assert {k: got[k] for k in order} == order
+    assert store.get("no-such-order") is None and "no-such-order" not in store
+
+
+def test_find_uses_every_filter(store, synthetic):
+    source = json.loads(synthetic.read_text(encoding="utf-8"))["orders"]
+    user_id = source[0]["user_id"]
+    expected = {o["order_id"] for o in source if o["user_id"] == user_id and o["status"] == "delivered"}
+    found, more = store.find(1000, user_id=user_id, status="delivered")
+    assert {o["order_id"] for o in found} == expected and not more
+
+    found, more = store.find(3, status="delivered")
+    assert len(found) == 3 and more
+    with pytest.raises(ValueError):
+        store.find(5, order_type="x")
+    assert set(ORDER_INDEXES) == {"user_id", "status", "vendor_name"}
+
+
+def test_transition_is_compare_and_set(store, synthetic):
+    order_id = json.loads(synthetic.read_text(encoding="utf-8"))["orders"][0]["order_id"]
+    before = store.get(order_id)["status"]
+    order, applied = store.transition(order_id, lambda o: o["status"] == before, {"status": "cancelled"})
+    assert applied and order["status"] == "cancelled"
+    order, applied = store.transition(order_id, lambda o: o["status"] == before, {"status": "delivered"})
+    assert not applied and order["status"] == "cancelled"
+    assert store.transition("no-such-order", lambda o: True, {"status": "x"}) == (None, False)
+    # Found by the index under its new value only.
+    found, _ = store.find(1000, status=before, user_id=store.get(order_id)["user_id"])
+    assert order_id not in {o["order_id"] for o in found}
+
+
+def test_sqlite_reuses_its_file_until_the_source_changes(synthetic, tmp_path):
+    db = str(tmp_path / "orders.sqlite")
+    _, first = load_dataset(synthetic, "sqlite", store_path=db)
+    order_id = first.find(1, status="pending")[0][0]["order_id"]
+    first.update(order_id, {"status": "cancelled"})
+    _, again = load_dataset(synthetic, "sqlite", store_path=db)
+    assert again.get(order_id)["status"] == "cancelled"  # opened, not rebuilt
+    _, fresh = load_dataset(synthetic, "sqlite", fresh=True, store_path=db)
+    assert fresh.get(order_id)["status"] == "pending"
+
+
+def test_store_bases_are_abstract():
+    class Partial(OrderStore):
+        def get(self, order_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+    with pytest.raises(TypeError):
+        Catalog()
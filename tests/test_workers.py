@@ -0,0 +1,57 @@
+"""
+Several worker processes: sharing one SQLite store, or refused for in-memory ones.
+
+    python -m pytest -q tests
+"""
+
+import pytest
+
+from helpers import TIMEOUT, result, run, start, worker_env
+
+
+# ----------- user-003: compare-and-set across worker processes ------------ #
+
+def test_refund_race_across_processes_approves_once(data_file, tmp_path):
+    env = worker_env(data_file, STORE_MODE="sqlite")
+    order_id = run("emit(first_order(lambda o: o['eligible_for_refund']))", env)  # also builds the file
+    go = tmp_path / "go"
+    workers = [
+        start(
+            f"""
+            emit("ready")
+            wait_for({str(go)!r})
+            emit(call(main.request_refund, order_id={order_id!r}, reason="race"))
+            """,
+            env,
+        )
+        for _ in range(8)
+    ]
+    for proc in workers:  # every worker has imported main and opened the file
+        assert proc.stdout.readline().strip() == '"ready"'
+    go.touch()
+    outcomes = [result(proc) for proc in workers]
+
+    approved = [r for r in outcomes if r["ok"]]
+    assert len(approved) == 1
+    assert all(r["error"]["message"] == "Order not eligible for refund" for r in outcomes if not r["ok"])
+    assert run(f"emit(main.ORDERS.get({order_id!r})['eligible_for_refund'])", env) is False
+
+
+@pytest.mark.parametrize("mode", ["memory", "compact"])
+def test_second_in_memory_worker_refuses_to_start(data_file, tmp_path, mode):
+    env = worker_env(data_file, STORE_MODE=mode)
+    done = tmp_path / "done"
+    first = start(f"emit('ready'); wait_for({str(done)!r}); emit('served')", env)
+    assert first.stdout.readline().strip() == '"ready"'
+    second = start("emit('started')", env)
+    _, err = second.communicate(timeout=TIMEOUT)
+    done.touch()
+    assert result(first) == "served"
+    assert second.returncode != 0 and "Multiple workers need STORE_MODE=sqlite" in err
+    assert run("emit('restarted')", env) == "restarted"  # the lock goes with the process
+
+
+def test_sqlite_workers_share_the_data_file(data_file):
+    env = worker_env(data_file, STORE_MODE="sqlite")
+    workers = [start("emit(len(main.ORDERS))", env) for _ in range(3)]
+    assert len({result(proc) for proc in workers}) == 1